@@ -0,0 +1,136 @@
+# airfoil_picker_ui.py - search the airfoil catalog by shape
+#
+# Copyright (C) 2013-2017 - Curtis Olson, curtolson@flightgear.org
+# http://madesigner.flightgear.org
+
+import os.path
+
+from PyQt5.QtWidgets import (QDialog, QHBoxLayout, QVBoxLayout, QFormLayout,
+                             QPushButton, QLineEdit, QLabel, QListWidget,
+                             QFileDialog)
+
+from madlib import catalog
+
+
+class AirfoilPicker(QDialog):
+    def __init__(self, title="Select Airfoil"):
+        QDialog.__init__(self)
+        self.setWindowTitle(title)
+        self.selected = ""
+        self.make_page()
+        self.update_list()
+
+    # returns the selected airfoil name (or "" if canceled)
+    @staticmethod
+    def select(title="Select Airfoil"):
+        picker = AirfoilPicker(title)
+        picker.exec_()
+        return picker.selected
+
+    def make_range(self, lo="", hi=""):
+        edit_lo = QLineEdit(lo)
+        edit_lo.setFixedWidth(60)
+        edit_lo.textChanged.connect(self.update_list)
+        edit_hi = QLineEdit(hi)
+        edit_hi.setFixedWidth(60)
+        edit_hi.textChanged.connect(self.update_list)
+        line = QHBoxLayout()
+        line.addWidget(edit_lo)
+        line.addWidget(QLabel("to"))
+        line.addWidget(edit_hi)
+        line.addStretch(1)
+        return (edit_lo, edit_hi, line)
+
+    def make_page(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        form = QFormLayout()
+        layout.addLayout(form)
+        self.edit_name = QLineEdit()
+        self.edit_name.textChanged.connect(self.update_list)
+        form.addRow("Name contains:", self.edit_name)
+        self.thickness_lo, self.thickness_hi, line = self.make_range()
+        form.addRow("Thickness (% chord):", line)
+        self.thickness_x_lo, self.thickness_x_hi, line = self.make_range()
+        form.addRow("Max thickness at (% chord):", line)
+        self.camber_lo, self.camber_hi, line = self.make_range()
+        form.addRow("Camber (% chord):", line)
+
+        self.list = QListWidget()
+        self.list.setMinimumWidth(550)
+        self.list.setMinimumHeight(300)
+        self.list.itemDoubleClicked.connect(self.accept_selection)
+        layout.addWidget(self.list)
+
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+
+        buttons = QHBoxLayout()
+        layout.addLayout(buttons)
+        browse = QPushButton("Browse Files ...")
+        browse.clicked.connect(self.browse_files)
+        buttons.addWidget(browse)
+        buttons.addStretch(1)
+        cancel = QPushButton("Cancel")
+        cancel.clicked.connect(self.reject)
+        buttons.addWidget(cancel)
+        ok = QPushButton("Select")
+        ok.setDefault(True)
+        ok.clicked.connect(self.accept_selection)
+        buttons.addWidget(ok)
+
+    # turn a pair of % edit fields into a (min, max) range in chord
+    # units
+    def get_range(self, edit_lo, edit_hi):
+        result = []
+        for edit in (edit_lo, edit_hi):
+            try:
+                result.append(float(edit.text()) * 0.01)
+            except ValueError:
+                result.append(None)
+        return tuple(result)
+
+    def update_list(self):
+        self.list.clear()
+        if catalog.get_catalog() == None:
+            self.status.setText("Airfoil catalog not built, use 'Browse Files ...'")
+            return
+        ranges = {}
+        ranges['thickness'] = self.get_range(self.thickness_lo,
+                                             self.thickness_hi)
+        ranges['thickness_x'] = self.get_range(self.thickness_x_lo,
+                                               self.thickness_x_hi)
+        ranges['camber'] = self.get_range(self.camber_lo, self.camber_hi)
+        pattern = self.edit_name.text().lower()
+        count = 0
+        for name in catalog.search(**ranges):
+            d = catalog.describe(name)
+            if pattern != "" and not pattern in name.lower() \
+               and not pattern in d['description'].lower():
+                continue
+            text = "%-14s t=%5.2f%%  c=%5.2f%%  %s" \
+                % (name, 100*d['thickness'], 100*d['camber'],
+                   d['description'])
+            self.list.addItem(text)
+            count += 1
+        self.status.setText(str(count) + " matching airfoils")
+
+    def accept_selection(self):
+        item = self.list.currentItem()
+        if item == None:
+            return
+        self.selected = item.text().split()[0]
+        self.accept()
+
+    def browse_files(self):
+        airfoil_path = catalog.airfoil_dir()
+        (filename, mask) = QFileDialog.getOpenFileName(None, "Open File",
+                                                       airfoil_path,
+                                                       "Airfoil (*.dat)")
+        if ( filename == "" ):
+            return
+        basename = os.path.basename(str(filename))
+        fileroot, ext = os.path.splitext(basename)
+        self.selected = fileroot
+        self.accept()
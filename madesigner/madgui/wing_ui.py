@@ -10,7 +10,7 @@ from PyQt5.QtWidgets import (QWidget,
                              QHBoxLayout, QVBoxLayout, QFrame, QFormLayout,
                              QPushButton, QTabWidget, QGroupBox,
                              QLineEdit, QTextEdit, QLabel, QScrollArea,
-                             QInputDialog, QMenu, QFileDialog)
+                             QInputDialog, QMenu)
 
 from .combobox_nowheel import QComboBoxNoWheel
 
@@ -22,6 +22,7 @@ from .simple_hole_ui import SimpleHoleUI
 from .shaped_hole_ui import ShapedHoleUI
 from .build_tab_ui import BuildTabUI
 from .flap_ui import FlapUI
+from .airfoil_picker_ui import AirfoilPicker
 
 
 class WingUI():
@@ -94,28 +95,16 @@ class WingUI():
             self.edit_wing_link.setCurrentIndex(0)
 
     def select_airfoil_root(self):
-        basepath = os.path.split(os.path.realpath(__file__))[0]
-        airfoil_path = os.path.join(basepath, "../airfoils/")
-        (filename, mask) = QFileDialog.getOpenFileName(None, "Open File",
-                                                       airfoil_path,
-                                                       "Airfoil (*.dat)")
-        if ( filename == "" ):
+        name = AirfoilPicker.select("Select Root Airfoil")
+        if ( name == "" ):
             return
-        basename = os.path.basename(str(filename))
-        fileroot, ext = os.path.splitext(basename)
-        self.edit_airfoil_root.setText(fileroot)
+        self.edit_airfoil_root.setText(name)
 
     def select_airfoil_tip(self):
-        basepath = os.path.split(os.path.realpath(__file__))[0]
-        airfoil_path = os.path.join(basepath, "../airfoils/")
-        (filename, mask) = QFileDialog.getOpenFileName(None, "Open File",
-                                                       airfoil_path,
-                                                       "Airfoil (*.dat)")
-        if ( filename == "" ):
+        name = AirfoilPicker.select("Select Tip Airfoil")
+        if ( name == "" ):
             return
-        basename = os.path.basename(str(filename))
-        fileroot, ext = os.path.splitext(basename)
-        self.edit_airfoil_tip.setText(fileroot)
+        self.edit_airfoil_tip.setText(name)
 
     def generate_stations(self):
         text, ok = QInputDialog.getText(None, 'Input Dialog', 
@@ -2,6 +2,8 @@
 import copy
 import math
 
+from . import geometry
+
 
 # maintain a list of unique vertices
 class VertexDB:
@@ -88,7 +90,7 @@ class AC3D:
 
         # pass 1b run through the tristrip and count the number of
         # side face tris
-        strip_list = poly2d.triStrip()
+        strip_list = geometry.tri_strip(poly2d)
         for strip in strip_list:
             # times 2 because we have 2 sides
             surfs += 2 * (len(strip) - 2)
@@ -9,18 +9,26 @@ __license__ = "GPL v2"
 import sys
 import os.path
 import fileinput
+import functools
 import math
 #import string
 import re
+import numpy as np
 import Polygon
 
 from pkg_resources import resource_stream
 
-from .contour import Contour
+from .contour import Contour, as_tuples
+from . import catalog
 from . import spline
 
 datapath = "../data"
 
+# Airfoil.resample() implementation: "numpy" (vectorized) or "python"
+# (the original point by point version, kept so the two can be cross
+# checked, see bench.py)
+resample_method = "numpy"
+
 class Airfoil(Contour):
 
     def __init__(self, name = "", samples = 0, use_spline = False):
@@ -32,11 +40,82 @@ class Airfoil(Contour):
         self.parax = []
         self.paray = []
         self.nosedist = 0.0
+        self.frozen = False
         if ( name != "" ):
             self.load(name, samples, use_spline)
 
+    # a frozen airfoil is a shared template (see shared() below) and
+    # must not be modified, use clone() to get a private copy.
+    def __setattr__(self, name, value):
+        if self.__dict__.get('frozen', False):
+            raise AttributeError("airfoil '" + self.name + "' is a shared template, clone() it before modifying")
+        object.__setattr__(self, name, value)
+
+    # copies (copy.deepcopy(), pickle) of a frozen airfoil are
+    # private and therefore not frozen
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['frozen'] = False
+        return state
+
+    def freeze(self):
+        self.storage = "list"
+        self.top = tuple(self.top)
+        self.bottom = tuple(self.bottom)
+        self.parax = tuple(self.parax)
+        self.paray = tuple(self.paray)
+        self.frozen = True
+
+    # return a private (mutable) copy of this airfoil.  Ribs never
+    # resample, so make_raw_rib() skips the parametric (parax, paray)
+    # curves with parametric=False.
+    def clone(self, parametric=True):
+        result = Airfoil()
+        self.copy_into(result)
+        if parametric:
+            result.parax = list(self.parax)
+            result.paray = list(self.paray)
+            result.nosedist = self.nosedist
+        return result
+
     def load(self, base, samples = 0, use_spline = False):
         self.name = base
+        # prefer the precompiled catalog (see catalog.py) and only
+        # fall back to parsing the .dat file when the airfoil is
+        # missing from the catalog or the catalog entry is stale.
+        entry = catalog.lookup(base)
+        if entry != None:
+            self.description = entry.description
+            self.top = entry.top
+            self.bottom = entry.bottom
+            self.parax = entry.parax
+            self.paray = entry.paray
+            self.nosedist = entry.nosedist
+        else:
+            self.load_dat(base)
+        if samples > 0:
+            self.resample( samples, use_spline )
+
+    # parse the original airfoil .dat file
+    def load_dat(self, base):
+        # this 'pkg_resources' approach to lets us read airfoil data
+        # out of a compressed egg install
+        airfoil_res = os.path.join('airfoils', base + ".dat")
+        f = resource_stream('madlib', airfoil_res)
+        data = f.read()
+        f.close()
+        description, layout, points = parse_dat(data)
+        top, bottom, para, nosedist = split_surfaces(points)
+        self.description = description
+        self.top = list(map(tuple, top.tolist()))
+        self.bottom = list(map(tuple, bottom.tolist()))
+        self.parax = list(map(tuple, para[:,0:2].tolist()))
+        self.paray = list(map(tuple, para[:,0::2].tolist()))
+        self.nosedist = nosedist
+
+    # the original line by line parser (Selig layout only), kept so
+    # parse_dat() can be cross checked against it (see bench.py)
+    def load_dat_python(self, base):
         top = True
         dist = 0.0
         dlast = 0.0
@@ -105,14 +184,56 @@ class Airfoil(Contour):
         #print "PARAY"
         #for pt in self.paray:
         #    print str(pt[0]) + " " + str(pt[1])
-        if samples > 0:
-            self.resample( samples, use_spline )
-            #print "RESAMPLE"
-            #print str(self.top)
-            #print str(self.bottom)
-            #self.display()
 
-    def resample(self, xdivs, use_spline):
+    def resample(self, xdivs, use_spline, method=None):
+        if method == None:
+            method = resample_method
+        if method == "numpy":
+            self.resample_numpy(xdivs, use_spline)
+        else:
+            self.resample_python(xdivs, use_spline)
+
+    # same output as resample_python(), but each surface is looked up
+    # and evaluated in one shot
+    def resample_numpy(self, xdivs, use_spline):
+        para = np.array( [ (px[0], px[1], py[1])
+                           for px, py in zip(self.parax, self.paray) ] )
+        dist = para[:,0]
+        xa = para[:,1]
+        ya = para[:,2]
+        totaldist = dist[-1]
+        steps = np.arange(0, xdivs+1)
+        dtop = steps * (self.nosedist / xdivs)
+        dbottom = steps * ((totaldist - self.nosedist) / xdivs) \
+            + self.nosedist
+        d = np.concatenate( (dtop, dbottom) )
+
+        index = spline.binsearch_array(dist, d)
+        if use_spline:
+            x = spline.Spline(para[:,0:2]).evaluate(d, index)
+            y = spline.Spline(para[:,0::2]).evaluate(d, index)
+        else:
+            # vectorized simple_interp()
+            if len(dist) > 1:
+                drange = dist[index+1] - dist[index]
+                wide = drange > 0.0001
+                percent = np.where(wide, d - dist[index], 0.0) \
+                    / np.where(wide, drange, 1.0)
+                x = xa[index] + percent * (xa[index+1] - xa[index])
+                y = ya[index] + percent * (ya[index+1] - ya[index])
+            else:
+                x = xa[index]
+                y = ya[index]
+
+        n = xdivs + 1
+        top = np.column_stack( (x[:n], y[:n]) )
+        top = top[top[:,0] >= 0.0]
+        bottom = np.column_stack( (np.where(x[n:] < 0.0, 0.0, x[n:]),
+                                   y[n:]) )
+        self.top = list(map(tuple, top[::-1].tolist()))
+        self.bottom = list(map(tuple, bottom.tolist()))
+
+    def resample_python(self, xdivs, use_spline):
         self.top = []
         self.bottom = []
         n = len(self.parax)
@@ -153,31 +274,40 @@ class Airfoil(Contour):
             self.bottom.append( (x, y) )
 
     def walk_curve_from_front(self, curve, xstart, target_dist):
-        #print "walk from " + str(xstart) + " dist of " + str(target_dist)
-        n = len(curve)
-        dist = 0
-        cur = ( xstart, self.simple_interp(curve, xstart) )
-        next_index = spline.binsearch(curve, xstart) + 1
-        if next_index < n:
-            dist_to_next = self.dist_2d(cur, curve[next_index])
-        else:
+        return float(self.walk_curve_from_front_many(curve, xstart,
+                                                     target_dist))
+
+    # walk along curve ("top", "bottom" or a list of points) starting
+    # at xstart and return the x position reached after each of the
+    # target_dists (a scalar or an array) of surface distance
+    def walk_curve_from_front_many(self, curve, xstart, target_dists):
+        pts = self.surface_array(curve)
+        target_dists = np.asarray(target_dists, dtype=float)
+        n = len(pts)
+        next_index = spline.binsearch(pts, xstart) + 1
+        if next_index >= n:
             # ran out of points
-            return cur[0]
-        #print "idx = " + str(next_index) + " dist_to_next = " + str(dist_to_next)
-        while dist + dist_to_next < target_dist:
-            dist += dist_to_next
-            cur = curve[next_index]
-            next_index += 1
-            if next_index < n:
-                dist_to_next = self.dist_2d(cur, curve[next_index])
-            else:
-                # ran out of points
-                return cur[0]
-        rem = target_dist - dist
-        pct = rem / dist_to_next
-        dx = curve[next_index][0] - cur[0]
-
-        return cur[0] + dx * pct
+            return np.full(target_dists.shape, xstart)
+        # start of each remaining segment (the first one starts at
+        # xstart) and its length
+        start = np.empty( (n - next_index + 1, 2) )
+        start[0] = (xstart, self.interp_many(curve, xstart))
+        start[1:] = pts[next_index:]
+        end = pts[next_index:]
+        dx = end[:,0] - start[:-1,0]
+        dy = end[:,1] - start[:-1,1]
+        seglen = np.sqrt(dx*dx + dy*dy)
+        # cumulative distance at the end of each segment (summed in
+        # order, the same as walking the points one at a time)
+        total = np.cumsum(seglen)
+        k = np.searchsorted(total, target_dists, side='left')
+        ran_out = k >= len(seglen)
+        k = np.minimum(k, len(seglen) - 1)
+        dist = np.where(k > 0, total[k-1], 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = (target_dists - dist) / seglen[k]
+        result = start[k,0] + dx[k] * pct
+        return np.where(ran_out, pts[n-1,0], result)
 
     def walk_curve_from_back(self, curve, xend, target_dist):
         print("walk from " + str(xend) + " dist of " + str(target_dist))
@@ -210,8 +340,7 @@ class Airfoil(Contour):
 
     def cutout_leading_edge_diamond(self, size, pos=None, nudge=0.0):
         # make the Polygon representation of this part if needed
-        if self.poly == None:
-            self.make_poly()
+        self.need_poly()
 
         target_diag = math.sqrt(2*size*size)
         # walk backwards equal amounts along both top and bottom curves until
@@ -222,13 +351,25 @@ class Airfoil(Contour):
         n = len(self.top)
         xstart = self.top[0][0]
         chord = self.top[n-1][0] - xstart
-        while cur_diag < target_diag and dist < chord:
-            xtop = self.walk_curve_from_front(self.top, xstart, dist)
-            ytop = self.simple_interp(self.top, xtop)
-            xbottom = self.walk_curve_from_front(self.bottom, xstart, dist)
-            ybottom = self.simple_interp(self.bottom, xbottom)
-            cur_diag = self.dist_2d( (xtop, ytop), (xbottom, ybottom) )
-            dist += step
+        # (a chunk of steps at a time)
+        for dists in step_positions(dist, step, chord):
+            xtops = self.walk_curve_from_front_many("top", xstart, dists)
+            ytops = self.interp_many("top", xtops)
+            xbottoms = self.walk_curve_from_front_many("bottom", xstart, dists)
+            ybottoms = self.interp_many("bottom", xbottoms)
+            dx = xbottoms - xtops
+            dy = ybottoms - ytops
+            diags = np.sqrt(dx*dx + dy*dy)
+            found = np.flatnonzero(diags >= target_diag)
+            i = found[0] if len(found) else len(dists) - 1
+            xtop = float(xtops[i])
+            ytop = float(ytops[i])
+            xbottom = float(xbottoms[i])
+            ybottom = float(ybottoms[i])
+            cur_diag = float(diags[i])
+            dist = float(dists[i]) + step
+            if len(found):
+                break
         if dist >= chord:
             print("unable to fit leading edge, stock diagonal longer than rib height?")
             return []
@@ -254,7 +395,7 @@ class Airfoil(Contour):
         p4 = ( xtop-size*1.5, ytop )
         p5 = ( xbottom-size*1.5, ybottom )
         mask = Polygon.Polygon( (p1, p2, p3, p4, p5) )
-        self.poly = self.poly - mask
+        self.cut(mask)
 
         # also make the true shape while we are here (reusing the
         # bottom of the cut mask)
@@ -321,8 +462,7 @@ class Airfoil(Contour):
             return
 
         # make the Polygon representation of this part if needed
-        if self.poly == None:
-            self.make_poly()
+        self.need_poly()
 
         tn = len(self.top)
         bn = len(self.bottom)
@@ -340,15 +480,25 @@ class Airfoil(Contour):
         xpos = xtail - step
         cur_mid = step
         # walk forward specified distances along top and bottom curves
-        # (starting at the back)
+        # (starting at the back, a chunk of steps at a time)
         ytop = 0.0
         ybottom = 0.0
-        while cur_mid <= mid_dist and xpos >= xnose:
-            ytop = self.simple_interp(self.top, xpos)
-            ybottom = self.simple_interp(self.bottom, xpos)
-            ymid = (ytop + ybottom) * 0.5
-            cur_mid = self.dist_2d( (xtail, ytail), (xpos, ymid) )
-            xpos -= step
+        for xs in step_positions(xpos, -step, xnose):
+            ytops = self.interp_many("top", xs)
+            ybottoms = self.interp_many("bottom", xs)
+            ymids = (ytops + ybottoms) * 0.5
+            dx = xs - xtail
+            dy = ymids - ytail
+            mids = np.sqrt(dx*dx + dy*dy)
+            found = np.flatnonzero(mids > mid_dist)
+            i = found[0] if len(found) else len(xs) - 1
+            ytop = float(ytops[i])
+            ybottom = float(ybottoms[i])
+            ymid = float(ymids[i])
+            cur_mid = float(mids[i])
+            xpos = float(xs[i]) - step
+            if len(found):
+                break
 
         dx = xpos - xtail
         dy = ymid - ytail
@@ -447,9 +597,9 @@ class Airfoil(Contour):
         # you can see exactly the trailing edge part that gets cutout.
         exact_shape = False
         if exact_shape:
-            self.poly = self.poly - contour
+            self.cut(contour)
         else:
-            self.poly = self.poly - mask
+            self.cut(mask)
 
         result = []
         for p2 in contour[0]:
@@ -464,8 +614,7 @@ class Airfoil(Contour):
     def cutout_trailing_edge_sheet(self, width=0.0, height=0.0, shape="",
                                    force_fit=True, pos=None, nudge=0.0):
         # make the Polygon representation of this part if needed
-        if self.poly == None:
-            self.make_poly()
+        self.need_poly()
 
         tn = len(self.top)
         bn = len(self.bottom)
@@ -483,12 +632,20 @@ class Airfoil(Contour):
         xpos = xtail - step
         cur_dist = step
         # walk forward specified distances along the bottom curve
-        # (starting at the back)
+        # (starting at the back, a chunk of steps at a time)
         ybottom = 0.0
-        while cur_dist <= width and xpos >= xnose:
-            ybottom = self.simple_interp(self.bottom, xpos)
-            cur_dist = self.dist_2d( (xtail, ytail), (xpos, ybottom) )
-            xpos -= step
+        for xs in step_positions(xpos, -step, xnose):
+            ybottoms = self.interp_many("bottom", xs)
+            dx = xs - xtail
+            dy = ybottoms - ytail
+            dists = np.sqrt(dx*dx + dy*dy)
+            found = np.flatnonzero(dists > width)
+            i = found[0] if len(found) else len(xs) - 1
+            ybottom = float(ybottoms[i])
+            cur_dist = float(dists[i])
+            xpos = float(xs[i]) - step
+            if len(found):
+                break
 
         dx = xpos - xtail
         dy = ybottom - ytail
@@ -522,11 +679,11 @@ class Airfoil(Contour):
         # you can see exactly the trailing edge part that gets cutout.
         exact_shape = False
         if exact_shape:
-            self.poly = self.poly - contour
+            self.cut(contour)
         else:
             print("poly:", self.poly)
             print("mask:", mask)
-            self.poly = self.poly - mask
+            self.cut(mask)
 
         result = []
         for p2 in contour[0]:
@@ -534,26 +691,217 @@ class Airfoil(Contour):
             result.append(p3)
         return result
 
+# the values start, start+step, start+2*step, ... (while they are
+# short of end going down or up, depending on the sign of step) in
+# arrays of up to chunk values.  Each value is computed by adding step
+# to the previous one, exactly like the original point at a time
+# loops, so the chunked versions stop at the same positions.
+def step_positions(start, step, end, chunk=256):
+    v = start
+    while (step > 0 and v < end) or (step < 0 and v >= end):
+        values = []
+        while len(values) < chunk \
+              and ((step > 0 and v < end) or (step < 0 and v >= end)):
+            values.append(v)
+            v += step
+        yield np.array(values)
+
+# Bulk .dat file parser.  The whole file is converted in one go rather
+# than a line at a time:
+#
+#   Selig layout:    description line, then the coordinates running
+#                    from the trailing edge over the top surface to the
+#                    leading edge and back along the bottom surface.
+#   Lednicer layout: description line, a line with the number of top
+#                    and bottom points (i.e. "33.0  35.0"), then the
+#                    top and bottom surfaces, each running from the
+#                    leading edge to the trailing edge.
+#
+# The layout is recognized by the point count line.
+#
+# Some files give values in parentheses, i.e. "(0.0013)", which are
+# read as plain values, and some have "......" placeholder rows which
+# are dropped.  Rows with an x >= 100 are dropped as well (the same as
+# the original parser.)
+#
+# Returns (description, layout, points) where layout is "selig" or
+# "lednicer" and points is an (n x 2) array in Selig order.
+def parse_dat(data):
+    lines = data.splitlines()
+    if not len(lines):
+        return ("", "selig", np.zeros((0, 2)))
+    description = " ".join(lines[0].decode(errors='replace').split())
+    body = lines[1:]
+    points = None
+    # fast path: every non blank line is a plain "x y" pair, so the
+    # whole block converts in one call
+    tokens = b" ".join(body).split()
+    if len(tokens) == 2 * (len(body) - body.count(b"")):
+        try:
+            points = np.array(tokens, dtype=float).reshape(-1, 2)
+        except ValueError:
+            pass
+    if points is None:
+        rows = []
+        for line in body:
+            tokens = line.split()
+            if len(tokens) != 2:
+                # blank line or unknown data (comment?)
+                continue
+            if tokens[1].startswith(b"....."):
+                continue
+            rows.append(tokens)
+        values = b" ".join([b" ".join(row) for row in rows])
+        values = values.replace(b"(", b" ").replace(b")", b" ")
+        points = np.array(values.split(), dtype=float).reshape(-1, 2)
+    if not len(points):
+        return (description, "selig", points)
+
+    layout = "selig"
+    n1, n2 = points[0]
+    if n1 >= 2.0 and n2 >= 2.0 and n1 == int(n1) and n2 == int(n2):
+        layout = "lednicer"
+        points = points[1:]
+        # both surfaces run from the leading edge aft, so the top
+        # surface ends where x starts over (the counts themselves
+        # aren't trusted, some files list them bottom first)
+        restart = np.flatnonzero(np.diff(points[:,0]) < 0.0)
+        nu = restart[0] + 1 if len(restart) else len(points)
+        upper = points[:nu][::-1]
+        lower = points[nu:]
+        if len(lower) and len(upper) and np.all(lower[0] == upper[-1]):
+            lower = lower[1:]
+        points = np.concatenate((upper, lower))
+    points = points[points[:,0] < 100.0]
+    return (description, layout, points)
+
+# split a Selig ordered (n x 2) point array into top and bottom
+# surfaces (both running from the leading edge to the trailing edge)
+# and the surface distance parameterization.  Consecutive points with
+# the same x are dropped, the nose is the point before x first
+# increases (and is shared by both surfaces.)  Returns (top, bottom,
+# para, nosedist) where para rows are (dist, x, y).
+def split_surfaces(points):
+    if not len(points):
+        empty = np.zeros((0, 2))
+        return (empty, empty, np.zeros((0, 3)), 0.0)
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = points[1:,0] != points[:-1,0]
+    points = points[keep]
+    dx = np.diff(points[:,0])
+    dy = np.diff(points[:,1])
+    seg = np.sqrt(dx*dx + dy*dy)
+    dist = np.concatenate(([0.0], np.cumsum(seg)))
+    para = np.column_stack((dist, points))
+    rising = np.flatnonzero(dx > 0.0)
+    if len(rising):
+        nose = rising[0]
+        top = points[nose::-1]
+        bottom = points[nose:]
+        nosedist = float(dist[nose])
+    else:
+        top = points[::-1]
+        bottom = np.zeros((0, 2))
+        nosedist = 0.0
+    return (top, bottom, para, nosedist)
+
+# process wide cache of loaded (and resampled) airfoils.  Every wing
+# panel of a design typically uses the same few root/tip sections so
+# there is no reason to re-read and re-spline them for each panel.
+# The cached airfoils are frozen shared templates: read them freely,
+# but clone() (or copy.deepcopy()) before making changes.
+@functools.lru_cache(maxsize=32)
+def _load_shared(name, samples, use_spline):
+    af = Airfoil(name, samples, use_spline)
+    af.freeze()
+    return af
+
+def shared(name, samples = 0, use_spline = False):
+    return _load_shared(name, samples, use_spline)
+
+# cache statistics (hits, misses, maxsize, currsize)
+def cache_info():
+    return _load_shared.cache_info()
+
+def cache_clear():
+    _load_shared.cache_clear()
+
+# the y values of surface curve2 lined up with the points of curve1
+def match_surface(curve1, curve2):
+    if len(curve1) == len(curve2):
+        return curve2[:,1]
+    # different point counts (i.e. resampled at different rates) so
+    # interpolate curve2 at the curve1 x positions
+    order = np.argsort(curve2[:,0], kind='stable')
+    return np.interp(curve1[:,0], curve2[order,0], curve2[order,1])
+
+# a single station of a BlendedStations set.  This is a lightweight
+# stand in for an Airfoil (name, description, top, bottom) and
+# clone() turns it into a real Airfoil when one is needed.
+class StationView:
+    def __init__(self, name, description, top, bottom):
+        self.name = name
+        self.description = description
+        self.top = top          # (points x 2) array
+        self.bottom = bottom    # (points x 2) array
+        self._fits = {}         # (maxpts, maxerror) -> fit
+
+    # see Contour.fitted()
+    def fitted(self, maxpts = 30, maxerror = 0.1):
+        key = (maxpts, maxerror)
+        if key not in self._fits:
+            contour = Contour()
+            contour.top = as_tuples(self.top)
+            contour.bottom = as_tuples(self.bottom)
+            self._fits[key] = contour.fitted(maxpts, maxerror)
+        return self._fits[key]
+
+    # (a station has no parametric curves to copy)
+    def clone(self, parametric=True):
+        result = Airfoil()
+        result.name = self.name
+        result.description = self.description
+        result.top = self.top.copy()
+        result.bottom = self.bottom.copy()
+        return result
+
+# the blend of af1 -> af2 at a whole set of stations.  top and bottom
+# are (stations x points x 2) arrays, indexing returns a StationView.
+class BlendedStations:
+    def __init__(self, af1, af2, percents, top, bottom):
+        self.af1 = af1
+        self.af2 = af2
+        self.percents = percents
+        self.top = top
+        self.bottom = bottom
+
+    def __len__(self):
+        return len(self.percents)
+
+    def __getitem__(self, i):
+        percent = self.percents[i]
+        name = "blend " + self.af1.name + " " + self.af2.name
+        description = 'blend {:.2%}'.format(1.0-percent) + self.af1.description + ' + {:.2%}'.format(percent) + " " + self.af2.description
+        return StationView(name, description, self.top[i], self.bottom[i])
+
+# blend af1 -> af2 at every percentage in percents at once
+def blend_stations( af1, af2, percents ):
+    percents = np.asarray(percents, dtype=float)
+    p = percents[:,np.newaxis]
+    result = []
+    for curve1, curve2 in ( (af1.top, af2.top), (af1.bottom, af2.bottom) ):
+        curve1 = np.array(curve1, dtype=float).reshape(-1, 2)
+        curve2 = np.array(curve2, dtype=float).reshape(-1, 2)
+        y2 = match_surface(curve1, curve2)
+        shape = np.empty( (len(percents), len(curve1), 2) )
+        shape[:,:,0] = curve1[:,0]
+        shape[:,:,1] = (1.0-p)*curve1[:,1] + p*y2
+        result.append(shape)
+    return BlendedStations(af1, af2, percents.tolist(), result[0], result[1])
+
 # returns an airfoil that is 1.0-percent of af1 + percent of af2
 def blend( af1, af2, percent ):
-    result = Airfoil()
-    result.name = "blend " + af1.name + " " + af2.name
-    result.description = 'blend {:.2%}'.format(1.0-percent) + af1.description + ' + {:.2%}'.format(percent) + " " + af2.description
-
-    n = len(af1.top)
-    #print str(len(af1.top)) + " = " + str(len(af2.top))
-    for i in range(0, n):
-        y1 = af1.top[i][1]
-        y2 = af2.top[i][1]
-        y = (1.0-percent)*y1 + percent*y2
-        result.top.append( (af1.top[i][0], y) )
-    n = len(af1.bottom)
-    #print str(len(af1.bottom)) + " = " + str(len(af2.bottom))
-    for i in range(0, n):
-        y1 = af1.bottom[i][1]
-        y2 = af2.bottom[i][1]
-        y = (1.0-percent)*y1 + percent*y2
-        result.bottom.append( (af1.bottom[i][0], y) )
+    result = blend_stations(af1, af2, [percent])[0].clone()
     result.raw_top = list(result.top)
     result.raw_bottom = list(result.bottom)
     return result
@@ -0,0 +1,528 @@
+# bench.py - timing and cross checks for the geometry code
+#
+# Copyright (C) 2013-2017 - Curtis Olson, curtolson@flightgear.org
+# http://madesigner.flightgear.org
+
+# Each command times an optimized code path against the original
+# implementation it replaces and reports how far apart the results
+# are.
+#
+# Usage:
+#    python -m madlib.bench resample [airfoil ...]
+#    python -m madlib.bench parse [airfoil ...]
+#    python -m madlib.bench transform [airfoil ...]
+#    python -m madlib.bench fit [airfoil ...]
+#    python -m madlib.bench clone [airfoil ...]    (and the examples)
+#    python -m madlib.bench project [airfoil ...]
+#    python -m madlib.bench shaped [airfoil ...]
+#    python -m madlib.bench circle
+#    python -m madlib.bench backend [design.mad ...]
+#    python -m madlib.bench shared [airfoil ...]
+#    python -m madlib.bench stats [design.mad ...]
+
+import argparse
+import contextlib
+import copy
+import glob
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import Polygon.Shapes
+
+from . import airfoil
+from . import catalog
+from . import contour
+from . import geometry
+
+
+# run func() repeat times and return the best time in seconds
+def best_time(func, repeat=3):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best == None or elapsed < best:
+            best = elapsed
+    return best
+
+# max distance between two equal length point lists (None if the
+# lengths differ)
+def max_diff(pts1, pts2):
+    if len(pts1) != len(pts2):
+        return None
+    if len(pts1) == 0:
+        return 0.0
+    return float(np.max(np.abs(np.array(pts1) - np.array(pts2))))
+
+def report(label, t1, t2, diff):
+    if diff == None:
+        diffstr = "point count differs!"
+    else:
+        diffstr = "max diff = %.3g" % diff
+    print("  %-28s %9.3f ms %9.3f ms  %6.1fx  %s"
+          % (label, 1000*t1, 1000*t2, t1/max(t2, 1e-9), diffstr))
+
+
+def bench_resample(names, samples_list=(25, 100, 1000)):
+    print("resample: python vs. numpy")
+    for name in names:
+        base = airfoil.Airfoil(name)
+        for samples in samples_list:
+            for use_spline in (True, False):
+                af1 = base.clone()
+                af2 = base.clone()
+                t1 = best_time(lambda: af1.resample(samples, use_spline,
+                                                    method="python"))
+                t2 = best_time(lambda: af2.resample(samples, use_spline,
+                                                    method="numpy"))
+                diff = max(max_diff(af1.top, af2.top) or 0.0,
+                           max_diff(af1.bottom, af2.bottom) or 0.0)
+                if len(af1.top) != len(af2.top) \
+                   or len(af1.bottom) != len(af2.bottom):
+                    diff = None
+                label = "%s %d %s" % (name, samples,
+                                      "spline" if use_spline else "linear")
+                report(label, t1, t2, diff)
+
+
+def bench_parse(names):
+    print("parse .dat: line by line vs. bulk")
+    t1 = 0.0
+    t2 = 0.0
+    worst = 0.0
+    count = 0
+    for name in names:
+        af1 = airfoil.Airfoil()
+        af2 = airfoil.Airfoil()
+        try:
+            t1 += best_time(lambda: airfoil.Airfoil().load_dat_python(name))
+        except (ValueError, IndexError, UnicodeDecodeError):
+            # the bulk parser handles a few files the original can't
+            continue
+        t2 += best_time(lambda: airfoil.Airfoil().load_dat(name))
+        af1.load_dat_python(name)
+        af2.load_dat(name)
+        diff = max(max_diff(af1.parax, af2.parax) or 0.0,
+                   max_diff(af1.paray, af2.paray) or 0.0)
+        if len(af1.parax) != len(af2.parax):
+            print("  %s: point count differs (%d vs. %d)"
+                  % (name, len(af1.parax), len(af2.parax)))
+        else:
+            worst = max(worst, diff)
+        count += 1
+    report(str(count) + " airfoils", t1, t2, worst)
+
+# the rib placement sequence (scale to chord, move, rotate for twist)
+# in "list" vs. "array" contour storage mode (including reading the
+# result back)
+def bench_transform(names, samples_list=(25, 100, 1000)):
+    print("contour transforms: list vs. array storage")
+    for name in names:
+        for samples in samples_list:
+            base = airfoil.Airfoil(name, samples, True)
+            result = {}
+            times = {}
+            for mode in ("list", "array"):
+                def run():
+                    af = base.clone()
+                    af.storage = mode
+                    af.scale(8.0, 8.0)
+                    af.move(-2.0, 0.0)
+                    af.rotate(2.5)
+                    af.rotate(90)
+                    # reading the points applies any pending transform
+                    return (af.top, af.bottom)
+                times[mode] = best_time(run)
+                result[mode] = run()
+            diff = max(max_diff(result["list"][0], result["array"][0]) or 0.0,
+                       max_diff(result["list"][1], result["array"][1]) or 0.0)
+            report("%s %d" % (name, samples), times["list"], times["array"],
+                   diff)
+
+# the rib outline simplification done in Structure.make_raw_rib()
+# (scaled to chord, then fit(500, 0.002)) plus a fit down to every
+# point so the worst case shows up too
+def bench_fit(names, samples_list=(25, 100, 1000)):
+    print("curve fit: original vs. segment heap")
+    for name in names:
+        for samples in samples_list:
+            af = airfoil.Airfoil(name, samples, True)
+            af.scale(8.0, 8.0)
+            for (maxpts, maxerror) in ((500, 0.002), (2*samples, 0.0)):
+                result = {}
+                times = {}
+                for method in ("python", "heap"):
+                    if method == "python":
+                        func = af.curve_fit_python
+                    else:
+                        func = af.curve_fit
+                    def run():
+                        return (func(af.top, maxpts, maxerror),
+                                func(af.bottom, maxpts, maxerror))
+                    times[method] = best_time(run)
+                    result[method] = run()
+                diff = max(max_diff(result["python"][0], result["heap"][0]) or 0.0,
+                           max_diff(result["python"][1], result["heap"][1]) or 0.0)
+                if len(result["python"][0]) != len(result["heap"][0]) \
+                   or len(result["python"][1]) != len(result["heap"][1]):
+                    diff = None
+                label = "%s %d (%d, %g)" % (name, samples, maxpts, maxerror)
+                report(label, times["python"], times["heap"], diff)
+
+# peak bytes allocated while func() runs, returns (peak, result)
+def peak_memory(func):
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (peak, result)
+
+# copying a rib shaped contour (resampled, fit to a chord, with a
+# Polygon and labels): copy.deepcopy() vs. clone(), and the
+# clone(parametric=False) used by Structure.make_raw_rib()
+def bench_clone(names, samples_list=(25, 100, 1000)):
+    print("contour copies: deepcopy vs. clone")
+    for name in names:
+        for samples in samples_list:
+            af = airfoil.Airfoil(name, samples, True)
+            af.scale(8.0, 8.0)
+            af.fit(500, 0.016)
+            af.add_label(4.0, 0.0, 14, 0, "WR1")
+            af.make_poly()
+            for label, func in (("clone", lambda: af.clone()),
+                                ("rib clone", lambda: af.clone(parametric=False))):
+                t1 = best_time(lambda: copy.deepcopy(af))
+                t2 = best_time(func)
+                copy1 = copy.deepcopy(af)
+                copy2 = func()
+                diff = max(max_diff(copy1.top, copy2.top) or 0.0,
+                           max_diff(copy1.bottom, copy2.bottom) or 0.0)
+                report("%s %d %s" % (name, samples, label), t1, t2, diff)
+
+# every clone() a build makes done with copy.deepcopy() instead (the
+# way the builder copied parts before clone() existed) for the
+# duration of the with block
+@contextlib.contextmanager
+def deepcopy_clones():
+    from . import structure
+    saved = (contour.Contour.clone, airfoil.Airfoil.clone,
+             structure.Rib.clone)
+    contour.Contour.clone = lambda self: copy.deepcopy(self)
+    airfoil.Airfoil.clone = lambda self, parametric=True: copy.deepcopy(self)
+    structure.Rib.clone = lambda self: copy.deepcopy(self)
+    try:
+        yield
+    finally:
+        (contour.Contour.clone, airfoil.Airfoil.clone,
+         structure.Rib.clone) = saved
+
+# peak traced memory while building the wing parts of each design
+# and nesting them on sheets, with every part copy made by
+# copy.deepcopy() vs. clone().  One untraced build first fills the
+# airfoil and circle caches so neither run pays for them.  diff is
+# the largest symmetric difference area between matching ribs.
+def bench_clone_peak(files):
+    print("build peak memory: deepcopy vs. clone")
+    tmpdir = tempfile.mkdtemp()
+    for filename in files:
+        design = load_design(filename)
+        root = os.path.splitext(os.path.basename(filename))[0]
+        fileroot = os.path.join(tmpdir, root)
+        def run():
+            (t, b) = build_parts(design, fileroot)
+            with contextlib.redirect_stdout(io.StringIO()):
+                for wing in b.wings:
+                    wing.layout_parts_sheets(b.sheet_w, b.sheet_h,
+                                             units=b.units, speed="fast")
+            return rib_polys(b)
+        try:
+            run()
+        except Exception as e:
+            print("  %s: build failed (%s)" % (root, repr(e)))
+            continue
+        with deepcopy_clones():
+            (m1, ribs1) = peak_memory(run)
+        (m2, ribs2) = peak_memory(run)
+        diff = max_xor_area(ribs1, ribs2)
+        if diff == None:
+            diffstr = "rib count differs!"
+        else:
+            diffstr = "max diff = %.3g" % diff
+        print("  %-28s %9.1f kB %9.1f kB  %6.2fx  %s"
+              % (root, m1/1024.0, m2/1024.0, m1/max(m2, 1), diffstr))
+
+# the sheeting cut (Contour.cutout_sweep()) projects the surface at
+# three offsets: one project_contour() call per offset vs. a single
+# project_contour_multi() call
+def bench_project(names, samples_list=(25, 100, 1000)):
+    print("surface projection: 3 x single vs. multi offset")
+    for name in names:
+        for samples in samples_list:
+            af = airfoil.Airfoil(name, samples, True)
+            af.scale(8.0, 8.0)
+            af.fit(500, 0.016)
+            ysize = 0.0625
+            def single():
+                return [ af.project_contour(surf="top", xstart=0.0,
+                                            xdist=3.0, ysize=y)
+                         for y in (0.0, -ysize, ysize) ]
+            def multi():
+                return af.project_contour_multi(surf="top", xstart=0.0,
+                                                xdist=3.0,
+                                                ysizes=(0.0, -ysize, ysize))
+            t1 = best_time(single)
+            t2 = best_time(multi)
+            diff = 0.0
+            for pts1, pts2 in zip(single(), multi()):
+                d = max_diff(pts1, pts2)
+                if d == None:
+                    diff = None
+                    break
+                diff = max(diff, d)
+            report("%s %d" % (name, samples), t1, t2, diff)
+
+# rounding the corners of a shaped lightening hole
+# (Contour.carve_shaped_hole()): a circle union per cut line point
+# vs. one offset of the cut line's hull.  diff is the area of the
+# symmetric difference of the two masks.
+def bench_shaped(names, samples_list=(100, 1000), circle_points_list=(8, 32)):
+    print("shaped hole: circles vs. offset")
+    for name in names:
+        for samples in samples_list:
+            af = airfoil.Airfoil(name, samples, True)
+            af.scale(8.0, 8.0)
+            af.save_bounds()
+            af.make_poly()
+            mask_cut = af.shaped_hole_cut_line(pos1=contour.Cutpos(percent=0.15),
+                                               pos2=contour.Cutpos(percent=0.6),
+                                               material_width=0.125,
+                                               radius=0.125)
+            for circle_points in circle_points_list:
+                def circles():
+                    return af.round_cut_line_circles(mask_cut, 0.125,
+                                                     circle_points)
+                def offset():
+                    return af.round_cut_line_offset(mask_cut, 0.125,
+                                                    circle_points)
+                t1 = best_time(circles)
+                t2 = best_time(offset)
+                diff = (circles() ^ offset()).area()
+                report("%s %d (%d points)" % (name, samples, circle_points),
+                       t1, t2, diff)
+
+# the round lightening holes (Contour.cut_hole()): a 1000 hole build
+# with Polygon.Shapes.Circle() vs. the cached unit circle templates
+def bench_circle(points_list=(8, 16, 32), count=1000):
+    print("hole circles: Polygon.Shapes vs. templates")
+    centers = [ (0.01*i, 0.001*i) for i in range(count) ]
+    for points in points_list:
+        def shapes():
+            return [ Polygon.Shapes.Circle(radius=0.1, center=c, points=points)
+                     for c in centers ]
+        def templates():
+            return [ contour.make_circle(radius=0.1, center=c, points=points)
+                     for c in centers ]
+        t1 = best_time(shapes)
+        t2 = best_time(templates)
+        diff = max( max_diff(c1[0], c2[0])
+                    for (c1, c2) in zip(shapes(), templates()) )
+        report("%d x %d points" % (count, points), t1, t2, diff)
+
+# a .mad design file as a property tree
+def load_design(filename):
+    # Builder needs the props (and FreeCAD) modules
+    from props import PropertyNode
+    import props_json
+    f = open(filename, 'r')
+    stream = f.read()
+    f.close()
+    design = PropertyNode()
+    props_json.loads(stream, design, "")
+    return design
+
+# build the wing parts of a design (no nesting, no FreeCAD model)
+# quietly, returns (seconds, builder)
+def build_parts(design, fileroot, **kwargs):
+    from . import builder
+    result = {}
+    def build():
+        result["build"] = builder.Builder(design, fileroot=fileroot,
+                                          nest_speed=None, make_model=False,
+                                          **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t = best_time(build, repeat=1)
+    return (t, result["build"])
+
+def rib_polys(b):
+    return [ rib.contour.poly for wing in b.wings
+             for rib in wing.right_ribs + wing.left_ribs ]
+
+# largest symmetric difference area between matching polygons (None
+# if the counts differ)
+def max_xor_area(polys1, polys2):
+    if len(polys1) != len(polys2):
+        return None
+    diff = 0.0
+    for poly1, poly2 in zip(polys1, polys2):
+        diff = max(diff, (poly1 ^ poly2).area())
+    return diff
+
+# the example designs under each geometry backend: "cut" builds the
+# wing parts (no nesting, no FreeCAD model), "nest" then lays the
+# finished ribs out on sheets.  diff is the largest symmetric
+# difference area between a rib from the polygon backend and the same
+# rib from the other one.
+def bench_backend(files):
+    names = geometry.available_backends()
+    if len(names) < 2:
+        print("only the polygon backend is available (is pyclipper installed?)")
+    print("geometry backends: " + " vs. ".join(names))
+    tmpdir = tempfile.mkdtemp()
+    for filename in files:
+        design = load_design(filename)
+        root = os.path.splitext(os.path.basename(filename))[0]
+        fileroot = os.path.join(tmpdir, root)
+        cut_times = {}
+        nest_times = {}
+        ribs = {}
+        for name in names:
+            try:
+                (cut_times[name], b) = build_parts(design, fileroot,
+                                                   geometry=name)
+            except Exception as e:
+                print("  %s: build failed (%s)" % (root, repr(e)))
+                break
+            ribs[name] = rib_polys(b)
+            def nest():
+                for wing in b.wings:
+                    wing.layout_parts_sheets(b.sheet_w, b.sheet_h,
+                                             units=b.units, speed="fast")
+            with contextlib.redirect_stdout(io.StringIO()):
+                nest_times[name] = best_time(nest, repeat=1)
+        geometry.set_backend("polygon")
+        if len(ribs) < len(names):
+            continue
+        for name in names[1:]:
+            diff = max_xor_area(ribs["polygon"], ribs[name])
+            report("%s cut" % root, cut_times["polygon"],
+                   cut_times[name], diff)
+            report("%s nest" % root, nest_times["polygon"],
+                   nest_times[name], diff)
+
+# the cache and polygon boolean counters (the Builder stats option)
+# for building the wing parts of each design
+def bench_stats(files):
+    tmpdir = tempfile.mkdtemp()
+    for filename in files:
+        design = load_design(filename)
+        root = os.path.splitext(os.path.basename(filename))[0]
+        try:
+            (t, b) = build_parts(design, os.path.join(tmpdir, root))
+        except Exception as e:
+            print("%s: build failed (%s)" % (root, repr(e)))
+            continue
+        print("%s: %.3f sec" % (root, t))
+        print("  airfoil cache:", airfoil.cache_info())
+        print("  polygon booleans:", contour.boolean_stats)
+        print("  circle cache:", contour.circle_cache_info())
+
+# every read only accessor has to work on the frozen templates
+# airfoil.shared() hands out (caching their results must not count
+# as modifying them), nothing may leave state behind on them, and
+# save_bounds() (a change) must be refused
+def check_shared(names, samples_list=(0, 25)):
+    print("read only accessors on shared templates")
+    failed = 0
+    for name in names:
+        for samples in samples_list:
+            af = airfoil.shared(name, samples, samples > 0)
+            cutpos = contour.Cutpos(percent=0.3)
+            checks = [
+                ("top", lambda: af.top),
+                ("bottom", lambda: af.bottom),
+                ("get_bounds", lambda: af.get_bounds()),
+                ("get_xpos", lambda: af.get_xpos(cutpos)),
+                ("get_slopes", lambda: af.get_slopes("top")),
+                ("get_slope", lambda: af.get_slope("top", 0.3)),
+                ("get_array", lambda: af.get_array("bottom")),
+                ("surface_array", lambda: af.surface_array("top")),
+                ("interp_many", lambda: af.interp_many("top", [0.1, 0.5])),
+                ("get_outline", lambda: af.get_outline()),
+                ("fitted", lambda: af.fitted(30, 0.001)),
+                ("intersect", lambda: af.intersect("top", (0.3, 0.0), None)),
+                ("intersect_all",
+                 lambda: af.intersect_all("top", (0.3, 0.0), None)),
+                ("project_contour",
+                 lambda: af.project_contour(surf="top", xstart=0.1,
+                                            xend=0.5, ysize=0.01)),
+                ("poly", lambda: af.poly),
+                ("poly_intersect", lambda: af.poly_intersect("top", 0.3)),
+                ("hull", lambda: af.hull()),
+                ("hull_area", lambda: af.hull_area()),
+                ("area", lambda: af.area()),
+                ("clone", lambda: af.clone()),
+            ]
+            for (label, func) in checks:
+                try:
+                    func()
+                except Exception as e:
+                    print("  %s %d %s: %s" % (name, samples, label, repr(e)))
+                    failed += 1
+            if len(af.saved_bounds):
+                print("  %s %d: bounds saved on the template" % (name, samples))
+                failed += 1
+            try:
+                af.save_bounds()
+                print("  %s %d: save_bounds() allowed" % (name, samples))
+                failed += 1
+            except AttributeError:
+                pass
+    print("  %d failures" % failed)
+    return failed
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark and cross check optimized geometry code paths.")
+    ap.add_argument("command", choices=["resample", "parse", "transform",
+                                        "fit", "clone", "project",
+                                        "shaped", "circle", "backend",
+                                        "shared", "stats"])
+    ap.add_argument("names", nargs="*",
+                    help="airfoils to test with (default: naca0015 and clarky, all airfoils for parse), or designs for backend and stats (default: the examples)")
+    args = ap.parse_args()
+
+    examples = os.path.join(os.path.dirname(__file__), "..", "madgui",
+                            "examples", "*.mad")
+
+    if args.command == "resample":
+        bench_resample(args.names or ["naca0015", "clarky"])
+    elif args.command == "transform":
+        bench_transform(args.names or ["naca0015", "clarky"])
+    elif args.command == "fit":
+        bench_fit(args.names or ["naca0015", "clarky"])
+    elif args.command == "clone":
+        bench_clone(args.names or ["naca0015", "clarky"])
+        bench_clone_peak(sorted(glob.glob(examples)))
+    elif args.command == "project":
+        bench_project(args.names or ["naca0015", "clarky"])
+    elif args.command == "shaped":
+        bench_shaped(args.names or ["naca0015", "clarky"])
+    elif args.command == "circle":
+        bench_circle()
+    elif args.command in ("backend", "stats"):
+        files = args.names or sorted(glob.glob(examples))
+        if args.command == "backend":
+            bench_backend(files)
+        else:
+            bench_stats(files)
+    elif args.command == "shared":
+        check_shared(args.names or ["naca0015", "clarky"])
+    elif args.command == "parse":
+        bench_parse(args.names or catalog.source_names())
+
+if __name__ == '__main__':
+    main()
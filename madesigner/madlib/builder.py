@@ -14,7 +14,9 @@ from props import PropertyNode
 import props_json
 
 from . import ac3d
+from . import airfoil
 from . import freecad
+from . import geometry
 from . import contour
 from .wing import Wing
 
@@ -30,11 +32,24 @@ class Builder():
 
     def __init__(self, design, fileroot=None,
                  airfoil_resample=25, circle_points=8,
-                 nest_speed="fast"):
+                 nest_speed="fast", contour_storage="list",
+                 geometry="polygon", make_model=True,
+                 stats=False):
         # airfoil_resample: 25 = fast, 100 = mid, 1000 = quality
         # circle_points: 8 = fast, 16 = mid, 32 = quality
+        # nest_speed: "fast", "medium" or "nice" (None = don't nest the
+        #   parts on sheets)
+        # contour_storage: "list" or "array" (see contour.py)
+        # geometry: clipping backend, "polygon" or "clipper" (see geometry.py)
+        # make_model: False = only build the wing parts (no FreeCAD model)
+        # stats: print the airfoil/circle cache and polygon boolean
+        #   counters once the parts are built
         self.airfoil_resample = airfoil_resample
         self.circle_points = circle_points
+        self.contour_storage = contour_storage
+        self.geometry = geometry
+        self.make_model = make_model
+        self.stats = stats
         self.nest_speed = nest_speed
         self.design = design
         self.fileroot = fileroot
@@ -401,6 +416,7 @@ class Builder():
         wing.units = self.units
         wing.airfoil_resample = self.airfoil_resample
         wing.circle_points=self.circle_points
+        wing.contour_storage = self.contour_storage
         wing.name = node.getString('name')
         airfoil_root = node.getString('airfoil_root')
         airfoil_tip = node.getString('airfoil_tip')
@@ -449,8 +465,9 @@ class Builder():
             self.parse_build_tab(wing, node.getChild('build_tab[%d]' % i))
 
         wing.build()
-        wing.layout_parts_sheets( self.sheet_w, self.sheet_h, units=self.units,
-                                  speed=self.nest_speed)
+        if self.nest_speed != None:
+            wing.layout_parts_sheets( self.sheet_w, self.sheet_h,
+                                      units=self.units, speed=self.nest_speed )
         #wing.layout_parts_templates( 8.5, 11 )
         wing.layout_plans( self.plans_w, self.plans_h, units=self.units )
 
@@ -483,11 +500,20 @@ class Builder():
         node = self.design.getChild('overview', True)
         self.parse_overview(node)
 
+        geometry.set_backend(self.geometry)
+        contour.reset_boolean_stats()
         self.wings = []
         for i in range(self.design.getLen('wing')):
             wing_node = self.design.getChild('wing[%d]' % i)
             wing = self.parse_wing(wing_node)
             self.wings.append(wing)
+        if self.stats:
+            print("airfoil cache:", airfoil.cache_info())
+            print("polygon booleans:", contour.boolean_stats)
+            print("circle cache:", contour.circle_cache_info())
+
+        if not self.make_model:
+            return
 
         # generate AC3D model
         # if len(self.wings):
@@ -0,0 +1,717 @@
+# catalog.py - precompiled binary airfoil catalog
+#
+# Copyright (C) 2013-2017 - Curtis Olson, curtolson@flightgear.org
+# http://madesigner.flightgear.org
+
+# Parsing the airfoil .dat text files (decode, split, regex per
+# coordinate) is slow relative to everything else we do with an
+# airfoil, so we compile the whole airfoil database once into a
+# single numpy archive.  Airfoil.load() pulls the parsed top, bottom,
+# parax, paray and nosedist values straight out of the catalog and
+# only falls back to the .dat file if the airfoil is missing or the
+# source file has changed since the catalog was built.
+#
+# The catalog lives in the user's cache directory (see default_path(),
+# the installed package may well be read only) and is compiled there
+# automatically the first time an airfoil is loaded.
+#
+# Usage:
+#    python -m madlib.catalog build    (compile the catalog)
+#    python -m madlib.catalog check    (report stale/missing entries)
+#    python -m madlib.catalog bench    (cold/warm load timings)
+#    python -m madlib.catalog search --thickness 12 14 --camber - 2
+#    python -m madlib.catalog validate [--jobs N] [--verbose]
+#                                      (parse and sanity check every
+#                                      .dat file, then compile the
+#                                      catalog from the good ones)
+#
+# The catalog also carries a small table of geometric descriptors for
+# every airfoil (see descriptor_names) so the database can be searched
+# by shape without opening any .dat file:
+#
+#    from madlib import catalog
+#    names = catalog.search(thickness=(0.12, 0.14), camber=(None, 0.02))
+
+import argparse
+import multiprocessing
+import os.path
+import time
+
+import numpy as np
+
+from pkg_resources import resource_filename, resource_stream
+
+from . import airfoil
+from .contour import as_tuples
+
+# bump this whenever the layout of the archive (or what the .dat parser
+# produces) changes so old catalogs are ignored rather than misread
+catalog_version = 4
+
+# geometric descriptors stored per airfoil (all normalized by chord)
+#   thickness    maximum thickness
+#   thickness_x  chordwise location of maximum thickness
+#   camber       maximum camber of the mean line (signed)
+#   camber_x     chordwise location of maximum camber
+#   le_radius    leading edge radius (circle through the nose and its
+#                two neighboring points)
+#   te_thickness trailing edge thickness
+#   points       number of (distinct) points in the source file
+descriptor_names = [ 'thickness', 'thickness_x', 'camber', 'camber_x',
+                     'le_radius', 'te_thickness', 'points' ]
+
+
+# directory holding the airfoil .dat files
+def airfoil_dir():
+    return resource_filename('madlib', 'airfoils')
+
+# per user cache directory ($XDG_CACHE_HOME or ~/.cache, %LOCALAPPDATA%
+# on windows)
+def cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME', '')
+    if base == '' and os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA', '')
+    if base == '':
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'madesigner')
+
+# default location of the compiled catalog
+def default_path():
+    return os.path.join(cache_dir(), 'airfoils.npz')
+
+def source_path(name):
+    return os.path.join(airfoil_dir(), name + ".dat")
+
+def source_names():
+    names = []
+    for file in sorted(os.listdir(airfoil_dir())):
+        root, ext = os.path.splitext(file)
+        if ext == ".dat":
+            names.append(root)
+    return names
+
+def source_stamp(name):
+    try:
+        st = os.stat(source_path(name))
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+# pack a list of variable length point lists into one big array plus
+# an offset index
+def pack(curves, width):
+    index = np.zeros(len(curves)+1, dtype=np.int64)
+    for i, curve in enumerate(curves):
+        index[i+1] = index[i] + len(curve)
+    data = np.zeros((index[-1], width))
+    for i, curve in enumerate(curves):
+        if len(curve):
+            data[index[i]:index[i+1]] = curve
+    return data, index
+
+# radius of the circle through three points (0.0 if colinear)
+def circumradius(p1, p2, p3):
+    a = np.linalg.norm(p2 - p1)
+    b = np.linalg.norm(p3 - p2)
+    c = np.linalg.norm(p1 - p3)
+    area2 = abs((p2[0]-p1[0])*(p3[1]-p1[1]) - (p3[0]-p1[0])*(p2[1]-p1[1]))
+    if area2 < 1e-12:
+        return 0.0
+    return a * b * c / (2.0 * area2)
+
+# compute the descriptor values (in descriptor_names order) for an
+# airfoil from its raw top and bottom curves
+def compute_descriptors(top, bottom, points):
+    result = dict.fromkeys(descriptor_names, 0.0)
+    result['points'] = points
+    if len(top) < 2 or len(bottom) < 2:
+        return result
+    top = np.array(top)
+    bottom = np.array(bottom)
+    top = top[np.argsort(top[:,0], kind='stable')]
+    bottom = bottom[np.argsort(bottom[:,0], kind='stable')]
+    xle = min(top[0,0], bottom[0,0])
+    xte = max(top[-1,0], bottom[-1,0])
+    chord = xte - xle
+    if chord <= 0.0:
+        return result
+
+    # sample both surfaces at cosine spaced stations (clustered at
+    # the leading and trailing edges)
+    x = xle + chord * 0.5 * (1.0 - np.cos(np.linspace(0.0, np.pi, 201)))
+    yt = np.interp(x, top[:,0], top[:,1])
+    yb = np.interp(x, bottom[:,0], bottom[:,1])
+
+    thick = yt - yb
+    i = np.argmax(thick)
+    result['thickness'] = thick[i] / chord
+    result['thickness_x'] = (x[i] - xle) / chord
+
+    # mean line relative to the chord line (leading edge to trailing
+    # edge mid points)
+    mean = 0.5 * (yt + yb)
+    chord_line = mean[0] + (mean[-1] - mean[0]) * (x - xle) / chord
+    camber = mean - chord_line
+    i = np.argmax(np.abs(camber))
+    result['camber'] = camber[i] / chord
+    result['camber_x'] = (x[i] - xle) / chord
+
+    result['le_radius'] = circumradius(top[1], top[0], bottom[1]) / chord
+    result['te_thickness'] = (top[-1,1] - bottom[-1,1]) / chord
+    return result
+
+# the parsed data for a single airfoil, in the same (list of tuples)
+# form Airfoil.load_dat() produces
+class Entry:
+    def __init__(self, name, description, top, bottom, parax, paray,
+                 nosedist):
+        self.name = name
+        self.description = description
+        self.top = top
+        self.bottom = bottom
+        self.parax = parax
+        self.paray = paray
+        self.nosedist = nosedist
+
+
+class Catalog:
+
+    def __init__(self, path=None):
+        if path == None:
+            path = default_path()
+        self.path = path
+        self.names = []
+        self.index = {}
+        self.arrays = {}
+        self.rejected = {}
+
+    # load the archive, returns False if there is no usable catalog
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        try:
+            data = np.load(self.path, allow_pickle=False)
+            arrays = {}
+            for key in data.files:
+                arrays[key] = data[key]
+            data.close()
+        except (OSError, ValueError, KeyError) as e:
+            print("airfoil catalog: unable to read " + self.path + ": "
+                  + str(e))
+            return False
+        if int(arrays['version'][0]) != catalog_version:
+            print("airfoil catalog: version mismatch, ignoring "
+                  + self.path)
+            return False
+        self.arrays = arrays
+        self.names = arrays['names'].tolist()
+        self.index = {}
+        for i, name in enumerate(self.names):
+            self.index[name] = i
+        self.rejected = {}
+        for i, name in enumerate(arrays['rejected'].tolist()):
+            self.rejected[name] = i
+        return True
+
+    # True if the source .dat file no longer matches what was
+    # compiled into the catalog
+    def is_stale(self, i):
+        stamp = source_stamp(self.names[i])
+        if stamp == None:
+            # source not available as a plain file (i.e. zipped egg),
+            # trust the catalog
+            return False
+        return stamp[0] != self.arrays['mtimes'][i] \
+            or stamp[1] != self.arrays['sizes'][i]
+
+    def find(self, name):
+        if name in self.index:
+            return self.index[name]
+        return None
+
+    def entry(self, i):
+        a = self.arrays
+        top = a['top'][a['top_index'][i]:a['top_index'][i+1]]
+        bottom = a['bottom'][a['bottom_index'][i]:a['bottom_index'][i+1]]
+        para = a['para'][a['para_index'][i]:a['para_index'][i+1]]
+        return Entry( self.names[i], str(a['descriptions'][i]),
+                      as_tuples(top), as_tuples(bottom),
+                      as_tuples(para[:,0:2]), as_tuples(para[:,0::2]),
+                      float(a['nosedist'][i]) )
+
+    def lookup(self, name):
+        i = self.find(name)
+        if i == None or self.is_stale(i):
+            return None
+        return self.entry(i)
+
+    # descriptor values for the named airfoil as a dict (None if not
+    # in the catalog)
+    def describe(self, name):
+        i = self.find(name)
+        if i == None:
+            return None
+        result = {}
+        for key in descriptor_names:
+            result[key] = self.arrays[key][i].item()
+        result['description'] = str(self.arrays['descriptions'][i])
+        return result
+
+    # return the (sorted) names of all airfoils whose descriptors fall
+    # inside the given ranges.  Each keyword is a descriptor name and
+    # a (min, max) pair, either end may be None for an open range,
+    # i.e. search(thickness=(0.12, 0.14), camber=(None, 0.02))
+    def search(self, **ranges):
+        mask = np.ones(len(self.names), dtype=bool)
+        for key, (lo, hi) in ranges.items():
+            if not key in descriptor_names:
+                print("airfoil catalog: unknown descriptor " + key)
+                return []
+            values = self.arrays[key]
+            if lo != None:
+                mask &= values >= lo
+            if hi != None:
+                mask &= values <= hi
+        return [self.names[i] for i in np.flatnonzero(mask)]
+
+    # parse every airfoil in the database and write the archive.
+    # validate_one() decides what goes in (the same rule the validate
+    # command uses), rejected airfoils are reported here and recorded
+    # so check() doesn't count them as missing.  Returns the list of
+    # rejected names.
+    def build(self, names=None):
+        if names == None:
+            names = source_names()
+        good = []
+        failed = []
+        for name in names:
+            result = validate_one(name)
+            if result.af == None:
+                print("airfoil catalog: skipping " + name + ": "
+                      + "; ".join(result.errors))
+                failed.append(name)
+                continue
+            good.append( (name, result.af) )
+        self.save(good, failed)
+        return failed
+
+    # write a list of (name, Airfoil) pairs to the archive, along with
+    # the names of the source files that were rejected
+    def save(self, airfoils, rejected=[]):
+        names = []
+        descriptions = []
+        mtimes = np.zeros(len(airfoils))
+        sizes = np.zeros(len(airfoils), dtype=np.int64)
+        nosedist = np.zeros(len(airfoils))
+        tops = []
+        bottoms = []
+        paras = []
+        descriptors = {}
+        for key in descriptor_names:
+            descriptors[key] = np.zeros(len(airfoils))
+        descriptors['points'] = np.zeros(len(airfoils), dtype=np.int64)
+        for i, (name, af) in enumerate(airfoils):
+            names.append(name)
+            descriptions.append(af.description)
+            stamp = source_stamp(name)
+            if stamp != None:
+                mtimes[i] = stamp[0]
+                sizes[i] = stamp[1]
+            nosedist[i] = af.nosedist
+            tops.append(af.top)
+            bottoms.append(af.bottom)
+            para = []
+            for px, py in zip(af.parax, af.paray):
+                para.append( (px[0], px[1], py[1]) )
+            paras.append(para)
+            values = compute_descriptors(af.top, af.bottom, len(af.parax))
+            for key in descriptor_names:
+                descriptors[key][i] = values[key]
+        rejected_mtimes = np.zeros(len(rejected))
+        rejected_sizes = np.zeros(len(rejected), dtype=np.int64)
+        for i, name in enumerate(rejected):
+            stamp = source_stamp(name)
+            if stamp != None:
+                rejected_mtimes[i] = stamp[0]
+                rejected_sizes[i] = stamp[1]
+        top, top_index = pack(tops, 2)
+        bottom, bottom_index = pack(bottoms, 2)
+        para, para_index = pack(paras, 3)
+        # write to a temp file first so a reader never sees a
+        # partially written catalog
+        dir = os.path.dirname(self.path)
+        if dir != '':
+            os.makedirs(dir, exist_ok=True)
+        tmp = self.path + ".%d.tmp.npz" % os.getpid()
+        np.savez(tmp, version=np.array([catalog_version]),
+                 names=np.array(names, dtype=str),
+                 descriptions=np.array(descriptions, dtype=str),
+                 mtimes=mtimes, sizes=sizes, nosedist=nosedist,
+                 top=top, top_index=top_index,
+                 bottom=bottom, bottom_index=bottom_index,
+                 para=para, para_index=para_index,
+                 rejected=np.array(rejected, dtype=str),
+                 rejected_mtimes=rejected_mtimes,
+                 rejected_sizes=rejected_sizes, **descriptors)
+        os.replace(tmp, self.path)
+        self.load()
+
+    # True if the named source was rejected by the last build and
+    # hasn't changed since
+    def is_rejected(self, name):
+        if not name in self.rejected:
+            return False
+        i = self.rejected[name]
+        stamp = source_stamp(name)
+        if stamp == None:
+            return True
+        return stamp[0] == self.arrays['rejected_mtimes'][i] \
+            and stamp[1] == self.arrays['rejected_sizes'][i]
+
+    # compare the catalog against the airfoil directory, returns
+    # (stale, missing) lists of names.  Sources the build rejected
+    # are neither, unless they have changed since.
+    def check(self):
+        stale = []
+        missing = []
+        for name in source_names():
+            i = self.find(name)
+            if i == None:
+                if not name in self.rejected:
+                    missing.append(name)
+                elif not self.is_rejected(name):
+                    stale.append(name)
+            elif self.is_stale(i):
+                stale.append(name)
+        return stale, missing
+
+
+# process wide catalog, loaded on first use and compiled first if
+# there is no usable one yet.  If that fails every airfoil is parsed
+# from its .dat file (said once).
+_catalog = None
+_catalog_loaded = False
+
+def get_catalog():
+    global _catalog
+    global _catalog_loaded
+    if not _catalog_loaded:
+        _catalog_loaded = True
+        cat = Catalog()
+        if not cat.load():
+            print("airfoil catalog: compiling " + cat.path)
+            try:
+                cat.build()
+            except OSError as e:
+                print("airfoil catalog: unable to write " + cat.path + ": "
+                      + str(e))
+        if len(cat.arrays):
+            _catalog = cat
+        else:
+            print("airfoil catalog: not available, parsing the .dat files")
+    return _catalog
+
+# return the catalog Entry for the named airfoil, or None if the
+# airfoil must be parsed from its .dat file
+_stale_reported = False
+
+def lookup(name):
+    global _stale_reported
+    cat = get_catalog()
+    if cat == None:
+        return None
+    entry = cat.lookup(name)
+    if entry == None and cat.find(name) != None and not _stale_reported:
+        _stale_reported = True
+        print("airfoil catalog: " + cat.path + " is out of date, run 'python -m madlib.catalog build'")
+    return entry
+
+# search the process wide catalog by descriptor ranges (see
+# Catalog.search()), returns an empty list if there is no catalog
+def search(**ranges):
+    cat = get_catalog()
+    if cat == None:
+        print("airfoil catalog: not available, run 'python -m madlib.catalog build'")
+        return []
+    return cat.search(**ranges)
+
+def describe(name):
+    cat = get_catalog()
+    if cat == None:
+        return None
+    return cat.describe(name)
+
+
+# result of validating a single .dat file
+#   af       parsed Airfoil (None if the file could not be parsed)
+#   elapsed  parse time in seconds
+#   errors   problems that keep the airfoil out of the catalog
+#   warnings problems with the parsed shape (the airfoil is still
+#            compiled, but probably won't build a sensible rib)
+#   notes    oddities of the file format load_dat() copes with
+class Validation:
+    def __init__(self, name):
+        self.name = name
+        self.af = None
+        self.elapsed = 0.0
+        self.errors = []
+        self.warnings = []
+        self.notes = []
+
+# number of direction changes along a list of x values
+def reversals(xs):
+    dx = np.diff(np.array(xs))
+    dx = dx[dx != 0.0]
+    if len(dx) < 2:
+        return 0
+    return int(np.count_nonzero(np.sign(dx[1:]) != np.sign(dx[:-1])))
+
+# scan the raw text for format quirks the parser works around
+def check_format(name, result):
+    f = resource_stream('madlib', os.path.join('airfoils', name + ".dat"))
+    raw = f.read()
+    f.close()
+    try:
+        if airfoil.parse_dat(raw)[1] == "lednicer":
+            result.notes.append("Lednicer format")
+    except ValueError:
+        pass
+    lines = raw.decode(errors='replace').splitlines()
+    data = [line.split() for line in lines[1:] if line.strip() != '']
+    parens = 0
+    dots = 0
+    other = 0
+    for tokens in data:
+        if len(tokens) != 2:
+            other += 1
+        elif tokens[1].startswith("....."):
+            dots += 1
+        elif tokens[1].startswith("("):
+            parens += 1
+    if parens:
+        result.notes.append(str(parens) + " parenthesised values")
+    if dots:
+        result.notes.append(str(dots) + " '......' rows skipped")
+    if other:
+        result.notes.append(str(other) + " non coordinate lines skipped")
+
+# sanity check the parsed shape
+def check_shape(af, result):
+    if len(af.bottom) == 0:
+        result.errors.append("no leading edge found (x never increases)")
+        return
+    if len(af.top) < 3 or len(af.bottom) < 3:
+        result.errors.append("degenerate surface (top %d, bottom %d points)"
+                             % (len(af.top), len(af.bottom)))
+        return
+    xs = [x for (d, x) in af.parax]
+    xmin = min(xs)
+    xmax = max(xs)
+    if xmax > 1.5:
+        result.warnings.append("x range %.4g to %.4g, not normalized to the chord (percent units?)" % (xmin, xmax))
+    elif xmin < -0.05 or xmax < 0.9:
+        result.warnings.append("unusual x range %.4g to %.4g" % (xmin, xmax))
+    n = reversals([x for (x, y) in af.top])
+    if n:
+        result.warnings.append("top surface x not monotonic ("
+                               + str(n) + " reversals)")
+    n = reversals([x for (x, y) in af.bottom])
+    if n:
+        result.warnings.append("bottom surface x not monotonic ("
+                               + str(n) + " reversals)")
+    values = compute_descriptors(af.top, af.bottom, len(af.parax))
+    if values['thickness'] <= 0.0:
+        result.warnings.append("zero thickness")
+    top = np.array(sorted(af.top))
+    bottom = np.array(sorted(af.bottom))
+    x = np.linspace(max(top[0,0], bottom[0,0]), min(top[-1,0], bottom[-1,0]),
+                    101)
+    gap = np.interp(x, top[:,0], top[:,1]) \
+        - np.interp(x, bottom[:,0], bottom[:,1])
+    chord = xmax - xmin
+    if chord > 0.0 and np.min(gap) < -0.001 * chord:
+        result.warnings.append("top and bottom surfaces cross")
+
+# parse and check one airfoil (runs in a worker process)
+def validate_one(name):
+    result = Validation(name)
+    af = airfoil.Airfoil()
+    start = time.time()
+    try:
+        af.load_dat(name)
+    except (ValueError, IndexError, UnicodeDecodeError) as e:
+        result.errors.append(type(e).__name__ + ": " + str(e))
+    result.elapsed = time.time() - start
+    try:
+        check_format(name, result)
+    except (OSError, UnicodeDecodeError) as e:
+        result.errors.append(type(e).__name__ + ": " + str(e))
+    if not len(result.errors):
+        check_shape(af, result)
+    if not len(result.errors):
+        result.af = af
+    return result
+
+# validate the named airfoils across a pool of worker processes,
+# returns the list of Validation results (in names order)
+def validate(names, jobs=None):
+    pool = multiprocessing.Pool(jobs)
+    try:
+        results = pool.map(validate_one, names, chunksize=16)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+def report_validation(results, verbose=False):
+    for r in results:
+        if not verbose and not len(r.errors) and not len(r.warnings):
+            continue
+        print("%-16s %8.3f ms" % (r.name, 1000*r.elapsed))
+        for msg in r.errors:
+            print("    error: " + msg)
+        for msg in r.warnings:
+            print("    warning: " + msg)
+        if verbose:
+            for msg in r.notes:
+                print("    note: " + msg)
+    errors = [r for r in results if len(r.errors)]
+    warnings = [r for r in results if len(r.warnings) and not len(r.errors)]
+    noted = [r for r in results if len(r.notes)]
+    times = np.array([r.elapsed for r in results])
+    print()
+    print("airfoils checked: " + str(len(results)))
+    print("  clean:          " + str(len(results) - len(errors) - len(warnings)))
+    print("  with warnings:  " + str(len(warnings)))
+    print("  failed:         " + str(len(errors)))
+    print("  format quirks:  " + str(len(noted)))
+    if len(times):
+        print("  parse time: total %.3f sec, mean %.3f ms, max %.3f ms"
+              % (np.sum(times), 1000*np.mean(times), 1000*np.max(times)))
+        print("  slowest:")
+        for i in np.argsort(times)[::-1][:5]:
+            print("    %-16s %8.3f ms" % (results[i].name, 1000*times[i]))
+
+
+def bench(names, path):
+    # cold: open the archive and pull every entry
+    start = time.time()
+    cat = Catalog(path)
+    if not cat.load():
+        print("No catalog at " + path + ", run the 'build' command first.")
+        return
+    for name in names:
+        cat.lookup(name)
+    cold_time = time.time() - start
+
+    # only time airfoils that made it into the catalog
+    names = [name for name in names if cat.find(name) != None]
+    if not len(names):
+        print("None of the requested airfoils are in the catalog.")
+        return
+
+    # parse of the original .dat text files
+    start = time.time()
+    for name in names:
+        af = airfoil.Airfoil()
+        af.load_dat(name)
+    dat_time = time.time() - start
+
+    # warm: archive already in memory
+    start = time.time()
+    for name in names:
+        cat.lookup(name)
+    warm_time = time.time() - start
+
+    n = len(names)
+    print("airfoils loaded: " + str(n))
+    print("  .dat parse:    %8.3f sec (%.3f ms/airfoil)" % (dat_time, 1000*dat_time/n))
+    print("  catalog cold:  %8.3f sec (%.3f ms/airfoil)" % (cold_time, 1000*cold_time/n))
+    print("  catalog warm:  %8.3f sec (%.3f ms/airfoil)" % (warm_time, 1000*warm_time/n))
+
+def main():
+    ap = argparse.ArgumentParser(description="Compile and inspect the binary airfoil catalog.")
+    ap.add_argument("command", choices=["build", "check", "bench", "search",
+                                        "validate"])
+    ap.add_argument("names", nargs="*", help="airfoil names (default: all)")
+    ap.add_argument("--path", default=default_path(),
+                    help="catalog file (default: %(default)s)")
+    ap.add_argument("--jobs", type=int,
+                    help="validate: worker processes (default: one per cpu)")
+    ap.add_argument("--no-save", action="store_true",
+                    help="validate: don't write the catalog")
+    ap.add_argument("--verbose", action="store_true",
+                    help="validate: list every airfoil, not just problems")
+    for key in descriptor_names:
+        ap.add_argument("--" + key, nargs=2, metavar=("MIN", "MAX"),
+                        help="search range ('-' for open ended, thickness, camber and radius values in %% of chord)")
+    args = ap.parse_args()
+
+    names = args.names
+    if not len(names):
+        names = source_names()
+
+    if args.command == "build":
+        start = time.time()
+        cat = Catalog(args.path)
+        failed = cat.build(names)
+        print("compiled " + str(len(names) - len(failed)) + " airfoils to "
+              + args.path + " in %.2f sec (%d rejected)"
+              % (time.time() - start, len(failed)))
+    elif args.command == "check":
+        cat = Catalog(args.path)
+        if not cat.load():
+            print("No usable catalog at " + args.path)
+            return
+        stale, missing = cat.check()
+        for name in stale:
+            print("stale: " + name)
+        for name in missing:
+            print("missing: " + name)
+        if len(stale) or len(missing):
+            print("Catalog is out of date, run the 'build' command.")
+        else:
+            print("Catalog is up to date (" + str(len(cat.names))
+                  + " airfoils, " + str(len(cat.rejected)) + " rejected.)")
+    elif args.command == "bench":
+        bench(names, args.path)
+    elif args.command == "validate":
+        start = time.time()
+        results = validate(names, args.jobs)
+        elapsed = time.time() - start
+        report_validation(results, args.verbose)
+        print("  wall time:  %.3f sec" % elapsed)
+        if not args.no_save:
+            good = [(r.name, r.af) for r in results if r.af != None]
+            rejected = [r.name for r in results if r.af == None]
+            cat = Catalog(args.path)
+            cat.save(good, rejected)
+            print("compiled " + str(len(good)) + " airfoils to " + args.path)
+    elif args.command == "search":
+        cat = Catalog(args.path)
+        if not cat.load():
+            print("No usable catalog at " + args.path)
+            return
+        ranges = {}
+        for key in descriptor_names:
+            pair = getattr(args, key)
+            if pair == None:
+                continue
+            scale = 1.0
+            if key != 'points':
+                scale = 0.01
+            lo, hi = [None if v == '-' else float(v) * scale for v in pair]
+            ranges[key] = (lo, hi)
+        start = time.time()
+        result = cat.search(**ranges)
+        elapsed = time.time() - start
+        for name in result:
+            d = cat.describe(name)
+            print("%-16s t=%5.2f%% @%3.0f%%  c=%5.2f%% @%3.0f%%  le=%.4f  te=%.4f  %s"
+                  % (name, 100*d['thickness'], 100*d['thickness_x'],
+                     100*d['camber'], 100*d['camber_x'], d['le_radius'],
+                     d['te_thickness'], d['description']))
+        print(str(len(result)) + " matches (%.2f ms)" % (1000*elapsed))
+
+if __name__ == '__main__':
+    main()
@@ -6,13 +6,16 @@ __version__ = "1.0"
 __license__ = "GPL v2"
 
 
+import bisect
 import fileinput
+import functools
+import heapq
 import math
 import string
+import numpy as np
+from . import geometry
 from . import spline
 import Polygon
-import Polygon.Shapes
-import Polygon.Utils
 
 
 class Cutpos:
@@ -51,11 +54,262 @@ class Cutout:
         self.cutpos = cutpos               # Cutpos()
 
 
+# Contour point storage: "list" keeps top and bottom as lists of (x, y)
+# tuples, "array" keeps them as (n x 2) numpy arrays while the contour
+# is being transformed.  In "array" mode rotate(), scale() and move()
+# don't touch the points at all, they just accumulate into a single
+# 3x3 transform which is applied in one pass the next time the
+# geometry (top, bottom or poly) is read.  Either way reading
+# contour.top/bottom returns a list of tuples (converted once, on
+# demand) so existing callers keep working, use get_array() to read
+# the points as an array.
+storage_mode = "list"
+
+def as_tuples(array):
+    return list(map(tuple, array.tolist()))
+
+# counts of the Polygon booleans done on part outlines and of the ones
+# skipped because the mask's bounding box can't touch the part (see
+# Contour.cut() and Contour.join())
+boolean_stats = { "cuts": 0, "cuts_skipped": 0, "differences": 0,
+                  "joins": 0, "joins_skipped": 0 }
+
+def reset_boolean_stats():
+    for key in boolean_stats:
+        boolean_stats[key] = 0
+
+# true if two Polygon.boundingBox() (xmin, xmax, ymin, ymax) boxes
+# overlap (or touch)
+def bounds_overlap(b1, b2):
+    return b1[0] <= b2[1] and b2[0] <= b1[1] \
+        and b1[2] <= b2[3] and b2[2] <= b1[3]
+
+# (sin, cos) of each point of a unit circle with the given number of
+# points, in the order Polygon.Shapes.Circle() makes them.  Shared by
+# every hole of a build so the trig is done once per point count.
+@functools.lru_cache(maxsize=16)
+def unit_circle(points):
+    result = []
+    for i in range(points):
+        a = 2.0*math.pi*float(i)/points
+        result.append( (math.sin(a), math.cos(a)) )
+    return tuple(result)
+
+# same points as Polygon.Shapes.Circle(radius, center, points), but
+# scaled and moved from the cached unit circle
+def make_circle(radius=1.0, center=(0.0, 0.0), points=32):
+    cx = center[0]
+    cy = center[1]
+    return Polygon.Polygon( [ (cx + radius*s, cy + radius*c)
+                              for (s, c) in unit_circle(points) ] )
+
+# circle template cache statistics (hits, misses, maxsize, currsize)
+def circle_cache_info():
+    return unit_circle.cache_info()
+
+# Minkowski sum of two convex polygons (point lists in either
+# winding): walk the edges of both in order of direction, starting
+# from the lowest vertex of each.  Linear in the number of points
+# instead of taking the hull of every pair.
+def minkowski_sum_convex(pts1, pts2):
+    edges = []
+    start = np.zeros(2)
+    for pts in (pts1, pts2):
+        a = np.array(pts, dtype=float)
+        x = a[:,0]
+        y = a[:,1]
+        if np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y) < 0.0:
+            a = a[::-1]
+        i = np.lexsort( (a[:,0], a[:,1]) )[0]
+        a = np.roll(a, -i, axis=0)
+        start += a[0]
+        edges.append(np.roll(a, -1, axis=0) - a)
+    edges = np.concatenate(edges)
+    angles = np.arctan2(edges[:,1], edges[:,0])
+    angles = np.where(angles < -1e-12, angles + 2.0*math.pi,
+                      np.maximum(angles, 0.0))
+    order = np.argsort(angles, kind="stable")
+    result = start + np.cumsum(edges[order], axis=0)
+    return np.roll(result, 1, axis=0).tolist()
+
+# a private copy of a stored surface: arrays are replaced rather than
+# modified (see get_array()) so they can be shared, lists are copied
+def copy_surface(points):
+    if isinstance(points, np.ndarray):
+        return points
+    return list(points)
+
+# intersect a line (point + slope, slope=None for a vertical line)
+# with every segment of an (n x 2) array of points at once, returns a
+# list of (xpos, segment index).  Segments (nearly) parallel to the
+# line are skipped.  Vertical segments are intersected in parametric
+# form, everything else with the same slope/intercept math as the
+# original segment by segment loop.
+def line_intersections(pts, pt, slope):
+    if len(pts) < 2:
+        return []
+    x1 = pts[:-1,0]
+    y1 = pts[:-1,1]
+    x2 = pts[1:,0]
+    y2 = pts[1:,1]
+    if slope == None:
+        dx = x2 - x1
+        x = np.full(len(dx), float(pt[0]))
+        hit = (dx != 0.0) & (x >= np.minimum(x1, x2)) \
+            & (x <= np.maximum(x1, x2))
+    else:
+        (x, hit) = segment_crossings(x1, y1, x2, y2, pt[0], pt[1], slope)
+    index = np.flatnonzero(hit)
+    return list(zip(x[index].tolist(), index.tolist()))
+
+# the non vertical line case of line_intersections() for segments
+# (x1, y1) -> (x2, y2) with a line through (px, py) at slope m1 each
+# (scalars or arrays as long as the segment arrays), returns (x, hit)
+def segment_crossings(x1, y1, x2, y2, px, py, m1):
+    dx = x2 - x1
+    dy = y2 - y1
+    lo = np.minimum(x1, x2)
+    hi = np.maximum(x1, x2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        b1 = py - m1 * px
+        vertical = np.abs(dx) <= 0.0001
+        m2 = dy / dx
+        b2 = y1 - m2 * x1
+        x = (b2 - b1) / (m1 - m2)
+        hit = ~vertical & (np.abs(m1 - m2) > 0.0001) \
+            & (x >= lo) & (x <= hi)
+        # where along a vertical segment the line crosses it
+        denom = dy - m1 * dx
+        t = (m1 * x1 + b1 - y1) / denom
+        vhit = vertical & (denom != 0.0) & (t >= 0.0) & (t <= 1.0)
+        x = np.where(vhit, x1 + t * dx, x)
+        hit |= vhit
+    return (x, hit)
+
+# the first crossing (lowest segment index) of each of a set of lines
+# with its own curve, in one pass over the segments of all the curves.
+# curves is a list of (n x 2) arrays, line i goes through pts[i] at
+# slopes[i] (not vertical).  Returns the x of each line's first
+# crossing (None for a miss), the same as line_intersections()[0][0].
+def first_line_intersections(curves, pts, slopes):
+    result = [None] * len(curves)
+    counts = [ max(len(curve) - 1, 0) for curve in curves ]
+    if sum(counts) == 0:
+        return result
+    starts = np.concatenate([ curve[:-1] for curve in curves if len(curve) > 1 ])
+    ends = np.concatenate([ curve[1:] for curve in curves if len(curve) > 1 ])
+    owner = np.repeat(np.arange(len(curves)), counts)
+    px = np.array([ pt[0] for pt in pts ], dtype=float)[owner]
+    py = np.array([ pt[1] for pt in pts ], dtype=float)[owner]
+    m1 = np.array(slopes, dtype=float)[owner]
+    (x, hit) = segment_crossings(starts[:,0], starts[:,1], ends[:,0],
+                                 ends[:,1], px, py, m1)
+    index = np.flatnonzero(hit)
+    # segments are in curve order, so the first hit of each owner
+    (owners, first) = np.unique(owner[index], return_index=True)
+    for (i, j) in zip(owners.tolist(), first.tolist()):
+        result[i] = x[index[j]].item()
+    return result
+
+# x interval index over the edges of a Polygon for vertical line
+# queries.  The distinct edge end point x values split the x axis into
+# cells (each end point value itself, and the open interval between
+# it and the next) and every edge is filed under the cells it spans,
+# so the edges crossing any x are found with one binary search
+# instead of a scan over every edge of every contour.
+class EdgeIndex:
+    def __init__(self, poly):
+        edges = []
+        for contour in poly:
+            pts = np.array(contour, dtype=float).reshape(-1, 2)
+            if len(pts) == 0:
+                continue
+            # each point and the one before it (wrapping around)
+            edges.append( np.hstack( (np.roll(pts, 1, axis=0), pts) ) )
+        if len(edges) == 0:
+            self.breaks = []
+            return
+        edges = np.concatenate(edges)
+        # order each edge left to right (a = left end, b = right end)
+        swap = ~(edges[:,0] < edges[:,2])
+        a = np.where(swap[:,np.newaxis], edges[:,2:4], edges[:,0:2])
+        b = np.where(swap[:,np.newaxis], edges[:,0:2], edges[:,2:4])
+        self.a = a
+        self.b = b
+        self.breaks = np.unique( np.concatenate( (a[:,0], b[:,0]) ) )
+        # edge i spans cells first[i] .. last[i]
+        first = 2 * np.searchsorted(self.breaks, a[:,0])
+        last = 2 * np.searchsorted(self.breaks, b[:,0])
+        counts = last - first + 1
+        ids = np.repeat(np.arange(len(a)), counts)
+        offsets = np.cumsum(counts) - counts
+        cells = np.repeat(first, counts) + np.arange(len(ids)) \
+            - np.repeat(offsets, counts)
+        order = np.argsort(cells, kind='stable')
+        start = np.zeros(2 * len(self.breaks), dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=2*len(self.breaks)-1),
+                  out=start[1:])
+        # queries are one at a time, so plain lists are faster to
+        # look things up in from here on
+        self.ids = ids[order].tolist()
+        self.start = start.tolist()
+        self.a = a.tolist()
+        self.b = b.tolist()
+        self.breaks = self.breaks.tolist()
+
+    # return the (min, max) y of the edges crossing x, or None
+    def intersect(self, x):
+        n = len(self.breaks)
+        if n == 0 or x < self.breaks[0] or x > self.breaks[n-1]:
+            return None
+        i = bisect.bisect_left(self.breaks, x)
+        if self.breaks[i] == x:
+            cell = 2 * i
+        else:
+            cell = 2 * i - 1
+        ids = self.ids[self.start[cell]:self.start[cell+1]]
+        if len(ids) == 0:
+            return None
+        ymin = None
+        ymax = None
+        for i in ids:
+            a = self.a[i]
+            b = self.b[i]
+            xrange = b[0] - a[0]
+            yrange = b[1] - a[1]
+            if xrange > 0.0001:
+                percent = (x - a[0]) / xrange
+                ypos= a[1] + percent * yrange
+            else:
+                ypos = a[1]
+            if ymin == None or ypos < ymin:
+                ymin = ypos
+            if ymax == None or ypos > ymax:
+                ymax = ypos
+        return (ymin, ymax)
+
+
 class Contour:
 
     def __init__(self):
         self.name = ""
         self.description = ""
+        self.storage = storage_mode
+        self._xform = None      # pending transform (see flush())
+        self._poly_angle = 0.0  # pending poly rotation (degrees)
+        self._poly = None
+        self._cuts = []         # queued cut masks (see cut())
+        self.version = 0        # bumped whenever top/bottom change
+        self._slopes = {}       # surf -> (version key, slopes)
+        self._arrays = {}       # surf -> (version key, points array)
+        self._fits = {}         # (maxpts, maxerror) -> (version key, fit)
+        # values derived from the points or the Polygon, kept in a
+        # dict so a frozen (shared template) airfoil can still cache
+        # them: "bounds" and "outline" -> (version key, value), and
+        # "edge_index" -> (poly key, EdgeIndex)
+        self._cache = {}
+        self.poly_version = 0   # bumped whenever the Polygon changes
+        self._poly_metrics = {} # name -> (poly_version, value)
         self.top = []
         self.bottom = []
         self.poly = None
@@ -63,6 +317,222 @@ class Contour:
         self.labels = []
         self.saved_bounds = []  # see self.save_bounds() for details
 
+    # top and bottom hold either a list of tuples or (in "array"
+    # storage mode, after a transform) an array.  Reading them
+    # always gives back a list (which then becomes the stored form,
+    # so in place edits like contour.top.append() work as before.)
+    @property
+    def top(self):
+        self.flush()
+        if isinstance(self._top, np.ndarray):
+            self._top = as_tuples(self._top)
+        return self._top
+
+    @top.setter
+    def top(self, value):
+        self.flush()
+        self._top = value
+        self.version += 1
+
+    @property
+    def bottom(self):
+        self.flush()
+        if isinstance(self._bottom, np.ndarray):
+            self._bottom = as_tuples(self._bottom)
+        return self._bottom
+
+    @bottom.setter
+    def bottom(self, value):
+        self.flush()
+        self._bottom = value
+        self.version += 1
+
+    # reading the Polygon applies any queued cuts first
+    @property
+    def poly(self):
+        self.flush()
+        if len(self._cuts):
+            self.apply_cuts()
+        return self._poly
+
+    # (assigning the Polygon drops any queued cuts)
+    @poly.setter
+    def poly(self, value):
+        self.flush()
+        self._poly = value
+        self._cuts = []
+        self.poly_changed()
+
+    # make the Polygon if there isn't one yet, without applying the
+    # queued cuts
+    def need_poly(self):
+        self.flush()
+        if self._poly == None:
+            self.make_poly()
+
+    # cut mask out of the Polygon.  The masks are queued and applied
+    # together the next time the Polygon is read (as one difference
+    # with the union of the masks), so a rib with many features
+    # doesn't pay for a full boolean on its whole outline per feature.
+    # Masks that can't touch the Polygon are dropped right away.
+    def cut(self, mask):
+        self.need_poly()
+        boolean_stats["cuts"] += 1
+        if len(self._poly) == 0 or len(mask) == 0 \
+           or not bounds_overlap(mask.boundingBox(), self._poly.boundingBox()):
+            boolean_stats["cuts_skipped"] += 1
+            return
+        self._cuts.append(mask)
+
+    # add shape to the Polygon (a shape clear of the Polygon is just
+    # added as another contour instead of computing the union)
+    def join(self, shape):
+        poly = self.poly
+        boolean_stats["joins"] += 1
+        if len(poly) == 0 or \
+           not bounds_overlap(shape.boundingBox(), poly.boundingBox()):
+            boolean_stats["joins_skipped"] += 1
+            result = Polygon.Polygon(poly)
+            for i, contour in enumerate(shape):
+                result.addContour(contour, shape.isHole(i))
+            self.poly = result
+            return
+        self.poly = geometry.union(poly, shape)
+
+    # apply the queued cuts (only those whose x range includes xpos if
+    # it is given, the rest don't change the Polygon at xpos)
+    def apply_cuts(self, xpos=None):
+        if xpos == None:
+            masks = self._cuts
+            self._cuts = []
+        else:
+            masks = []
+            rest = []
+            for mask in self._cuts:
+                bounds = mask.boundingBox()
+                if bounds[0] - 0.0001 <= xpos <= bounds[1] + 0.0001:
+                    masks.append(mask)
+                else:
+                    rest.append(mask)
+            self._cuts = rest
+        if len(masks) == 0:
+            return
+        boolean_stats["differences"] += 1
+        self._poly = geometry.subtract(self._poly, masks)
+        self.poly_changed()
+
+    # rotate the Polygon (and the queued cuts with it) about (0, 0)
+    def rotate_poly(self, angle):
+        rad = math.radians(angle)
+        self._poly.rotate(rad, 0.0, 0.0)
+        for mask in self._cuts:
+            mask.rotate(rad, 0.0, 0.0)
+        self.poly_changed()
+
+    # note that the Polygon changed (drops the values derived from it)
+    def poly_changed(self):
+        self._cache.pop("edge_index", None)
+        self.poly_version += 1
+
+    # return a copy that can be changed without affecting this contour
+    # (a much cheaper copy.deepcopy()).  The lists are copied but the
+    # point tuples, arrays and cached values are shared since they
+    # are never modified in place.
+    def clone(self):
+        result = Contour()
+        self.copy_into(result)
+        return result
+
+    # copy this contour's state into result (see clone())
+    def copy_into(self, result):
+        result.name = self.name
+        result.description = self.description
+        result.storage = self.storage
+        result._xform = self._xform
+        result._poly_angle = self._poly_angle
+        result._top = copy_surface(self._top)
+        result._bottom = copy_surface(self._bottom)
+        if self._poly != None:
+            result._poly = Polygon.Polygon(self._poly)
+        else:
+            result._poly = None
+        result._cuts = [ Polygon.Polygon(mask) for mask in self._cuts ]
+        result.version = self.version
+        result._slopes = dict(self._slopes)
+        result._arrays = dict(self._arrays)
+        result._fits = dict(self._fits)
+        result._cache = dict(self._cache)
+        result.poly_version = self.poly_version
+        result._poly_metrics = dict(self._poly_metrics)
+        result.cut_lines = list(self.cut_lines)
+        result.labels = list(self.labels)
+        result.saved_bounds = list(self.saved_bounds)
+
+    # apply any pending ("array" storage mode) transform to the
+    # points and the Polygon.  As with the point by point versions,
+    # scale() and move() don't affect the Polygon, only rotate() does.
+    def flush(self):
+        if self._xform is None:
+            return
+        m = self._xform
+        self._xform = None
+        for surf in ("top", "bottom"):
+            pts = self.get_array(surf)
+            result = np.empty_like(pts)
+            result[:,0] = m[0,0] * pts[:,0] + m[0,1] * pts[:,1] + m[0,2]
+            result[:,1] = m[1,0] * pts[:,0] + m[1,1] * pts[:,1] + m[1,2]
+            self.set_array(surf, result)
+        if self._poly_angle != 0.0:
+            if self._poly != None:
+                self.rotate_poly(self._poly_angle)
+            self._poly_angle = 0.0
+
+    # add a transform (3x3 matrix) to the pending transform
+    def push_transform(self, m):
+        if self._xform is None:
+            self._xform = m
+        else:
+            self._xform = np.dot(m, self._xform)
+
+    # return the surf="top" or "bottom" points as an (n x 2) array.
+    # In "array" storage mode the array becomes the stored form, the
+    # caller must not modify it in place.
+    def get_array(self, surf="top"):
+        self.flush()
+        if surf == "top":
+            points = self._top
+        else:
+            points = self._bottom
+        if isinstance(points, np.ndarray):
+            return points
+        if self.storage == "array":
+            points = np.array(points, dtype=float).reshape(-1, 2)
+            if surf == "top":
+                self._top = points
+            else:
+                self._bottom = points
+            return points
+        # "list" mode: cache the converted array until the surface
+        # changes
+        key = (self.version, len(points))
+        cached = self._arrays.get(surf)
+        if cached != None and cached[0] == key:
+            return cached[1]
+        array = np.array(points, dtype=float).reshape(-1, 2)
+        self._arrays[surf] = (key, array)
+        return array
+
+    # the closed outline of the shape (top reversed followed by the
+    # bottom) as a list of tuples, or an array in "array" storage
+    # mode
+    def get_outline(self):
+        if self.storage == "array":
+            return np.concatenate( (self.get_array("top")[::-1],
+                                    self.get_array("bottom")) )
+        reverse_top = list(self.top)
+        reverse_top.reverse()
+        return reverse_top + list(self.bottom)
+
     def dist_2d(self, pt1, pt2):
         result = 0.0
         if pt1[0] != None and pt1[1] != None:
@@ -71,7 +541,16 @@ class Contour:
             result = math.sqrt(dx*dx + dy*dy)
         return result
 
+    # interpolate y at v along points (None if v is outside the
+    # curve), see interp_many().  A single lookup in a list of points
+    # is cheaper done directly than through numpy.
     def simple_interp(self, points, v):
+        if isinstance(points, str) or isinstance(points, np.ndarray) \
+           or len(points) == 0:
+            y = self.interp_many(points, v)
+            if np.isnan(y):
+                return None
+            return float(y)
         if v < points[0][0]:
             return None
         if v > points[len(points)-1][0]:
@@ -81,17 +560,81 @@ class Contour:
         if index < n:
             xrange = points[index+1][0] - points[index][0]
             yrange = points[index+1][1] - points[index][1]
-	    # print(" xrange = $xrange\n")
             if xrange > 0.0001:
                 percent = (v - points[index][0]) / xrange
-                # print(" percent = $percent\n")
                 return points[index][1] + percent * yrange
             else:
                 return points[index][1]
         else:
             return points[index][1]
 
+    # interpolate y at every x in xs (a scalar or an array) along surf
+    # ("top", "bottom" or a list of points).  Same result as the
+    # original point at a time simple_interp() for each x (including
+    # its binary search on curves that aren't sorted in x), but x
+    # values outside the curve give nan instead of None.
+    def interp_many(self, surf, xs):
+        pts = self.surface_array(surf)
+        xs = np.asarray(xs, dtype=float)
+        if len(pts) == 0:
+            return np.full(xs.shape, np.nan)
+        xa = pts[:,0]
+        ya = pts[:,1]
+        n = len(pts) - 1
+        if n > 0 and np.all(xa[1:] >= xa[:-1]):
+            index = spline.binsearch_array(xa, xs)
+        else:
+            index = spline.binsearch_many(xa, xs)
+        following = np.minimum(index + 1, n)
+        xrange = xa[following] - xa[index]
+        yrange = ya[following] - ya[index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = (xs - xa[index]) / xrange
+            result = np.where(xrange > 0.0001, ya[index] + percent * yrange,
+                              ya[index])
+        outside = (xs < xa[0]) | (xs > xa[n])
+        return np.where(outside, np.nan, result)
+
+    # surf ("top", "bottom" or a list of points) as an (n x 2) array
+    def surface_array(self, surf):
+        if isinstance(surf, str):
+            return self.get_array(surf)
+        elif self._xform is None and surf is self._top:
+            # contour.top itself, use the cached array
+            return self.get_array("top")
+        elif self._xform is None and surf is self._bottom:
+            return self.get_array("bottom")
+        return np.asarray(surf, dtype=float).reshape(-1, 2)
+
+    # return the highest (surf="top") or lowest y where the vertical
+    # line at xpos crosses the Polygon outline (None if it misses).
+    # Uses an EdgeIndex of the Polygon which is built on first use
+    # and dropped whenever the Polygon changes.  A contour without a
+    # Polygon yet (like a shared template) uses its plain outline.
     def poly_intersect(self, surf="top", xpos=0.0):
+        self.flush()
+        if self._poly == None:
+            poly = self.outline_poly()
+            key = ("outline", self.points_key())
+        else:
+            self.apply_cuts(xpos)
+            poly = self._poly
+            key = self.poly_version
+        cached = self._cache.get("edge_index")
+        if cached == None or cached[0] != key:
+            cached = (key, EdgeIndex(poly))
+            self._cache["edge_index"] = cached
+        yrange = cached[1].intersect(xpos)
+        if yrange == None:
+            return None
+        if surf == "top":
+            return yrange[1]
+        else:
+            return yrange[0]
+
+    # the original full scan version of poly_intersect(), kept to
+    # cross check the edge index against
+    def poly_intersect_python(self, surf="top", xpos=0.0):
         if self.poly == None:
             self.make_poly()
 
@@ -135,7 +678,172 @@ class Contour:
         self.top = list( self.curve_fit(self.top, maxpts, maxerror) )
         self.bottom = list( self.curve_fit(self.bottom, maxpts, maxerror) )
 
+    # the (top, bottom) fit() would produce, without changing the
+    # contour.  Cached until the contour changes so a template airfoil
+    # is only simplified once per tolerance (see make_raw_rib() in
+    # structure.py.)  The lists are shared, copy them before editing.
+    def fitted(self, maxpts = 30, maxerror = 0.1):
+        self.flush()
+        key = (self.version, len(self._top), len(self._bottom))
+        cached = self._fits.get( (maxpts, maxerror) )
+        if cached != None and cached[0] == key:
+            return cached[1]
+        if len(self._fits) >= 64:
+            # i.e. a tapered wing, every rib has its own tolerance
+            self._fits.clear()
+        result = ( self.curve_fit(self.top, maxpts, maxerror),
+                   self.curve_fit(self.bottom, maxpts, maxerror) )
+        self._fits[ (maxpts, maxerror) ] = (key, result)
+        return result
+
+    # Greedy simplification: start with the end points and keep
+    # inserting the original point furthest off the fit (the first one
+    # on a tie) until it is within maxerror or there are maxpts points.
+    # Each segment of the fit keeps its worst point on a heap; an
+    # inserted point only splits the segment it lands in, so only the
+    # original points in that segment are re-interpolated.  The result
+    # is identical to curve_fit_python() (which fails outright on
+    # interior points outside the fit, they are never inserted here).
     def curve_fit(self, curve, maxpts = 30, maxerror = 0.1):
+        n = len(curve)
+        wip = [ curve[0], curve[n-1] ]
+
+        # the orginal interior points
+        interior = np.array(curve[1:n-1], dtype=float).reshape(-1, 2)
+        if len(interior) == 0:
+            return wip
+        if not wip[0][0] <= wip[1][0]:
+            # the fit isn't local when the curve runs right to left
+            return self.curve_fit_unsorted(curve, maxpts, maxerror)
+
+        # interior points sorted by x, so the points of each segment
+        # are a slice [lo:hi]
+        order = np.argsort(interior[:,0], kind='stable')
+        sx = interior[order,0]
+        sy = interior[order,1]
+        heap = []
+        count = [0]
+
+        # segment between wip[j] and wip[j+1] covering points lo:hi,
+        # returned as [lo, hi, alive]
+        def segment(j, lo, hi):
+            seg = [lo, hi, True]
+            if hi > lo:
+                # the same arithmetic as interp_many()
+                xs = sx[lo:hi]
+                (x0, y0) = wip[j]
+                (x1, y1) = wip[j+1]
+                xrange = x1 - x0
+                if xrange > 0.0001:
+                    iy = y0 + ((xs - x0) / xrange) * (y1 - y0)
+                else:
+                    iy = y0
+                diff = np.abs(sy[lo:hi] - iy)
+                diff[(xs < wip[0][0]) | (xs > wip[-1][0])] = -1.0
+                worst = diff.max()
+                i = int(order[lo:hi][diff == worst].min())
+                heapq.heappush(heap, (-worst, i, count[0], seg))
+                count[0] += 1
+            return seg
+
+        # (re)build every segment, point x belongs to the segment that
+        # starts at the last fit point <= x
+        def build():
+            for seg in segs:
+                seg[2] = False
+            wipx = [ pt[0] for pt in wip ]
+            bounds = np.searchsorted(sx, wipx, side='left')
+            bounds[0] = 0
+            bounds[-1] = len(sx)
+            return [ segment(j, bounds[j], bounds[j+1])
+                     for j in range(len(wip) - 1) ]
+
+        segs = []
+        segs = build()
+        while True:
+            # skip entries of segments that have been split since
+            while len(heap) and not heap[0][3][2]:
+                heapq.heappop(heap)
+            if len(heap) == 0:
+                break
+            worst = -heap[0][0]
+            i = heap[0][1]
+            if not (worst > 0 and worst > maxerror):
+                break
+
+            pt = curve[i+1]
+            maxx = pt[0]
+            maxy = pt[1]
+
+            # find insertion point
+            pos = 0
+            wipn = len(wip)
+            while pos < wipn and maxx > wip[pos][0]:
+                pos += 1
+            wip.insert( pos, (maxx, maxy) )
+            if len(wip) >= maxpts:
+                break
+
+            if (pos == 0 and maxx != wip[1][0]) or pos == len(wip) - 1:
+                # a new end point moves the fit range
+                segs = build()
+            else:
+                # split the segment the new point landed in (a point
+                # stacked on the first one splits the first segment)
+                j = max(pos - 1, 0)
+                seg = segs[j]
+                seg[2] = False
+                lo, hi = seg[0], seg[1]
+                mid = lo + int(np.searchsorted(sx[lo:hi], maxx, side='left'))
+                segs[j:j+1] = [ segment(j, lo, mid), segment(j+1, mid, hi) ]
+
+        return wip
+
+    # the same greedy insertion re-evaluating every point on every
+    # iteration, for curves that run right to left (where the fit
+    # isn't local).  Points off the fit are never inserted.
+    def curve_fit_unsorted(self, curve, maxpts = 30, maxerror = 0.1):
+        wip = []
+
+        # start with the end points
+        n = len(curve)
+        wip.append( curve[0] )
+        wip.append( curve[n-1] )
+
+        # the orginal interior points
+        interior = np.array(curve[1:n-1], dtype=float).reshape(-1, 2)
+
+        # iterate until termination conditions are met
+        done = len(interior) == 0
+        while not done:
+            # find the interior point furthest off the current fit
+            # (the first one if there is a tie)
+            iy = self.interp_many(wip, interior[:,0])
+            diff = np.nan_to_num(np.abs(interior[:,1] - iy), nan=-1.0)
+            i = int(np.argmax(diff))
+            if diff[i] > 0 and diff[i] > maxerror:
+                # found a match for a furthest off point
+                pt = curve[i+1]
+                maxx = pt[0]
+                maxy = pt[1]
+
+                # find insertion point
+                pos = 0
+                wipn = len(wip)
+                while pos < wipn and maxx > wip[pos][0]:
+                    pos += 1
+                wip.insert( pos, (maxx, maxy) )
+            else:
+                done = True
+
+            if len(wip) >= maxpts:
+                done = True
+
+        return wip
+
+    # the original greedy insertion, point at a time (kept as the
+    # reference for curve_fit(), see "python -m madlib.bench fit")
+    def curve_fit_python(self, curve, maxpts = 30, maxerror = 0.1):
         wip = []
 
         # start with the end points
@@ -198,6 +906,10 @@ class Contour:
         return (newx, newy)
 
     def rotate(self, angle):
+        if self.storage == "array":
+            self.rotate_array(angle)
+            return
+
         newtop = []
         for pt in self.top:
             newtop.append( self.rotate_point(pt, angle) )
@@ -220,10 +932,14 @@ class Contour:
                 newbounds.append( self.rotate_point(pt, angle) )
             self.saved_bounds = list(newbounds)
 
-        if self.poly != None:
-            self.poly.rotate(math.radians(angle), 0.0, 0.0)
+        if self._poly != None:
+            self.rotate_poly(angle)
 
     def scale(self, hsize, vsize):
+        if self.storage == "array":
+            self.scale_array(hsize, vsize)
+            return
+
         newtop = []
         newbottom = []
         newlabels = []
@@ -244,6 +960,10 @@ class Contour:
         self.labels = list(newlabels)
 
     def move(self, x, y):
+        if self.storage == "array":
+            self.move_array(x, y)
+            return
+
         newtop = []
         newbottom = []
         newlabels = []
@@ -263,28 +983,118 @@ class Contour:
         self.bottom = list(newbottom)
         self.labels = list(newlabels)
 
+    # "array" storage mode versions of rotate(), scale() and move().
+    # The points (and the Polygon) are transformed lazily, see
+    # flush().  The labels and saved bounds are few enough to update
+    # right away.
+    def rotate_array(self, angle):
+        rad = math.radians(angle)
+        cos = math.cos(rad)
+        sin = math.sin(rad)
+        self.push_transform( np.array( [[cos, -sin, 0.0],
+                                        [sin, cos, 0.0],
+                                        [0.0, 0.0, 1.0]] ) )
+
+        newlabels = []
+        for label in self.labels:
+            newx = label[0] * cos - label[1] * sin
+            newy = label[1] * cos + label[0] * sin
+            newlabels.append( (newx, newy, label[2], label[3] + angle, label[4]) )
+        self.labels = newlabels
+
+        if len(self.saved_bounds) > 0:
+            newbounds = []
+            for pt in self.saved_bounds:
+                newbounds.append( (pt[0] * cos - pt[1] * sin,
+                                   pt[1] * cos + pt[0] * sin) )
+            self.saved_bounds = newbounds
+
+        if self._poly != None:
+            self._poly_angle += angle
+
+    def scale_array(self, hsize, vsize):
+        self.push_transform( np.array( [[hsize, 0.0, 0.0],
+                                        [0.0, vsize, 0.0],
+                                        [0.0, 0.0, 1.0]] ) )
+        newlabels = []
+        for label in self.labels:
+            newlabels.append( (label[0] * hsize, label[1] * vsize,
+                               label[2], label[3], label[4]) )
+        self.labels = newlabels
+
+    def move_array(self, x, y):
+        self.push_transform( np.array( [[1.0, 0.0, x],
+                                        [0.0, 1.0, y],
+                                        [0.0, 0.0, 1.0]] ) )
+        newlabels = []
+        for label in self.labels:
+            newlabels.append( (label[0] + x, label[1] + y,
+                               label[2], label[3], label[4]) )
+        self.labels = newlabels
+
+    def set_array(self, surf, points):
+        if surf == "top":
+            self._top = points
+        else:
+            self._bottom = points
+        self.version += 1
+
+    # note that top/bottom were modified in place (i.e. a point was
+    # replaced through the list contour.top returned) so cached values
+    # derived from them get recomputed.  Assigning top/bottom or
+    # transforming the contour does this automatically.
+    def touch(self):
+        self.version += 1
+
+    # the 1st derivative (spline.derivative1()) at each point of
+    # surf="top" or "bottom".  Cached until the surface changes, so
+    # all the tangent cutouts on a rib share one computation.
+    def get_slopes(self, surf="top"):
+        self.flush()
+        if surf == "top":
+            key = (self.version, len(self._top))
+        else:
+            key = (self.version, len(self._bottom))
+        cached = self._slopes.get(surf)
+        if cached != None and cached[0] == key:
+            return cached[1]
+        pts = self.get_array(surf)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = spline.derivative1_array(pts[:,0], pts[:,1]).tolist()
+        self._slopes[surf] = (key, slopes)
+        return slopes
+
     # the saved "bounds" are used cooperatively to mark the size of
     # the part before any leading/trailing edge cutouts so that these
     # cuts don't cause us to lose the original size of the part and
     # our cut positions can remain constant through out the build
     # process.
+    # (a part is built from a clone() of its template, a shared
+    # template refuses this like any other change)
     def save_bounds(self):
-        self.saved_bounds = self.get_bounds()
+        self.saved_bounds = list(self.get_bounds())
 
     # given one of the possible ways to specify position, return the
     # actual position (relative to the original pre-cut part dimensions)
+    # A shared template never has saved bounds (and can't store
+    # them), its current bounds are used without being saved.
     def get_xpos(self, cutpos=None, station=None, sweep=0.0):
-        if len(self.saved_bounds) == 0:
-            print("need to call contour.save_bounds() after part created,")
-            print("but before any cutouts are made")
-            self.save_bounds()
-        chord = self.saved_bounds[1][0] - self.saved_bounds[0][0]
+        bounds = self.saved_bounds
+        if len(bounds) == 0:
+            if self.__dict__.get('frozen', False):
+                bounds = self.get_bounds()
+            else:
+                print("need to call contour.save_bounds() after part created,")
+                print("but before any cutouts are made")
+                self.save_bounds()
+                bounds = self.saved_bounds
+        chord = bounds[1][0] - bounds[0][0]
         if cutpos.percent != None:
-            xpos = self.saved_bounds[0][0] + chord * cutpos.percent
+            xpos = bounds[0][0] + chord * cutpos.percent
         elif cutpos.front != None:
-            xpos = self.saved_bounds[0][0] + cutpos.front
+            xpos = bounds[0][0] + cutpos.front
         elif cutpos.rear != None:
-            xpos = self.saved_bounds[1][0] - cutpos.rear
+            xpos = bounds[1][0] - cutpos.rear
         elif cutpos.xpos != None:
             # offset by sweep amount
             xpos = cutpos.xpos - sweep
@@ -302,49 +1112,29 @@ class Contour:
 
     def get_slope(self, surf="top", xpos=0.0):
         if surf == "top":
-            curve = list(self.top)
+            curve = self.top
         else:
-            curve = list(self.bottom)
-        slopes = spline.derivative1(curve)
+            curve = self.bottom
+        slopes = self.get_slopes(surf)
         index = spline.binsearch(curve, xpos)
         slope = slopes[index]
         return slope
 
-    # given a line (point + slope) return the "xpos" of the
-    # intersection with the contour (does not handle the special case
-    # of a vertical slope in either line)
+    # given a line (point + slope) return the "xpos" of the first
+    # intersection with the contour (None if the line misses it)
     def intersect(self, surf="top", pt=None, slope=None):
-        if surf == "top":
-            curve = list(self.top)
-        else:
-            curve = list(self.bottom)
-        m1 = slope
-        b1 = pt[1] - m1 * pt[0]
-        n = len(curve)
-        i = 0
-        found = False
-        while i < n+1 and not found:
-            pt1 = curve[i]
-            pt2 = curve[i+1]
-            dx = pt2[0] - pt1[0]
-            dy = pt2[1] - pt1[1]
-            if math.fabs(dx) > 0.0001:
-                m2 = dy / dx
-                b2 = pt1[1] - m2 * pt1[0]
-                if math.fabs(m1 - m2) > 0.0001:
-                    x = (b2 - b1) / (m1 - m2)
-                    if x >= pt1[0] and x <= pt2[0]:
-                        found = True
-                else:
-                    print("parallel lines")
-            else:
-                print("vertical segment")
-            i += 1
-        if found:
-            return x
+        hits = self.intersect_all(surf, pt, slope)
+        if len(hits):
+            return hits[0][0]
         else:
             return None
 
+    # every intersection of a line (point + slope, slope=None for a
+    # vertical line) with surf ("top", "bottom" or a list of points)
+    # as a list of (xpos, segment index) in curve order
+    def intersect_all(self, surf="top", pt=None, slope=None):
+        return line_intersections(self.surface_array(surf), pt, slope)
+
     # trim everything front or rear of a given position
     def trim(self, surf="top", discard="rear", cutpos=None, station=None):
         if surf == "top":
@@ -353,7 +1143,7 @@ class Contour:
             curve = list(self.bottom)
         newcurve = []
         xpos = self.get_xpos(cutpos, station)
-        ypos = self.simple_interp(curve, xpos)
+        ypos = self.simple_interp(surf, xpos)
         n = len(curve)
         i = 0
         if discard == "rear":
@@ -386,10 +1176,7 @@ class Contour:
     # form can also spit out try strips and do a few other tricks that
     # are handy later on.
     def make_poly(self):
-        reverse_top = list(self.top)
-        reverse_top.reverse()
-        shape = reverse_top + self.bottom
-        self.poly = Polygon.Polygon(shape)
+        self.poly = Polygon.Polygon(self.get_outline())
         # todo: add holes (should be easy, but want to work on other
         # aspects first)
         
@@ -411,8 +1198,7 @@ class Contour:
             tangent = True;
 
         # make the Polygon representation of this part if needed
-        if self.poly == None:
-            self.make_poly()
+        self.need_poly()
 
         # compute position of cutout
         xpos = self.get_xpos(cutout.cutpos, station=pos[0])
@@ -451,7 +1237,7 @@ class Contour:
         p2 = ( r2[0] + xpos, r2[1] + ypos )
         p3 = ( r3[0] + xpos, r3[1] + ypos )
         mask = Polygon.Polygon( (p0, p1, p2, p3) )
-        self.poly = self.poly - mask
+        self.cut(mask)
 
         # also make the true shape while we are here (reusing the
         # bottom of the cut mask)
@@ -479,23 +1265,16 @@ class Contour:
         # no support of tangent build tabs
 
         # make the Polygon representation of this part if needed
-        if self.poly == None:
-            self.make_poly()
-
-        if top:
-            curve = list(self.top)
-        else:
-            curve = list(self.bottom)
+        self.need_poly()
 
         # compute base position of cutout
         xpos = self.get_xpos(cutout.cutpos, station=station)
-        ypos = self.simple_interp(curve, xpos)
 
         xhalf = cutout.xsize / 2
         x1 = xpos - xhalf
         x2 = xpos + xhalf
-        y1 = self.simple_interp(curve, x1)
-        y2 = self.simple_interp(curve, x2)
+        ypos, y1, y2 = [None if math.isnan(y) else y for y in
+                        self.interp_many(cutout.surf, [xpos, x1, x2]).tolist()]
         ybase = y1
         if top:
             if y2 < y1:
@@ -515,7 +1294,7 @@ class Contour:
         p3 = (x2, ybase)
 
         tab = Polygon.Polygon( (p0, p1, p2, p3) )
-        self.poly = self.poly + tab
+        self.join(tab)
 
 
     def cutout_stringer(self, stringer, pos=None, nudge=0.0):
@@ -549,16 +1328,22 @@ class Contour:
         self.buildtab(cutout)
 
     def cut_hole(self, xpos, ypos, radius, points=32):
-        if self.poly == None:
-            self.make_poly()
-        hole = Polygon.Shapes.Circle(radius=radius, center=(xpos, ypos), \
-                                         points=points)
-        self.poly = self.poly - hole
+        hole = make_circle(radius=radius, center=(xpos, ypos), points=points)
+        self.cut(hole)
 
     def add_label(self, xpos, ypos, size, rotate, text):
         self.labels.append( (xpos, ypos, size, rotate, text) )        
 
     def project_point(self, orig, ysize, surf, slope):
+        angle = self.projection_angle(surf, slope)
+        r0 = self.rotate_point( (0, ysize), angle )
+        #print 'r0:', r0, 'orig:', orig
+        pt = ( r0[0] + orig[0], r0[1] + orig[1] )
+        return pt
+
+    # the angle (degrees) to rotate a (0, ysize) offset by to project
+    # it into the surface where it has the given slope
+    def projection_angle(self, surf, slope):
         rad = math.atan2(slope,1)
         angle = math.degrees(rad)
         #print "xpos " + str(xpos) + " angle = " + str(angle)
@@ -566,25 +1351,32 @@ class Contour:
             angle += 180
             if angle > 360:
                 angle -= 360
-        r0 = self.rotate_point( (0, ysize), angle )
-        #print 'r0:', r0, 'orig:', orig
-        pt = ( r0[0] + orig[0], r0[1] + orig[1] )
-        return pt
+        return angle
 
     def project_contour(self, surf="top",
                         xstart=0, xend=None, xdist=None,
                         ysize=0):
+        return self.project_contour_multi(surf, xstart, xend, xdist,
+                                          [ysize])[0]
+
+    # project_contour() at several ysize offsets at once, returns one
+    # list of points per ysize.  The surface is walked (and each point
+    # looked up and its projection angle found) only once for all the
+    # offsets.
+    def project_contour_multi(self, surf="top",
+                              xstart=0, xend=None, xdist=None,
+                              ysizes=(0,)):
         #print "xstart=" + str(xstart) + " xend=" + str(xend) + " xdist=" + str(xdist)
         curve = []
         #print "surf == " + surf
         if surf == "top":
-            curve = list(self.top)
+            curve = self.top
         else:
-            curve = list(self.bottom)
+            curve = self.bottom
         #print str(curve)
 
         n = len(curve)
-        slopes = spline.derivative1(curve)
+        slopes = self.get_slopes(surf)
         shape = []
 
         # make the exact sweep base line
@@ -631,38 +1423,35 @@ class Contour:
             if ypos:
                 shape.append( (xpos, ypos) )
 
-        # project the sweep line at the specified thickness
-        result = []
+        # project the sweep line at each of the specified thicknesses
+        results = [ [] for ysize in ysizes ]
         #print 'shape:', shape
         for p in shape:
             index = spline.binsearch(curve, p[0])
-            slope = slopes[index]
+            rad = math.radians(self.projection_angle(surf, slopes[index]))
+            cos = math.cos(rad)
+            sin = math.sin(rad)
             #print 'p:', p
-            proj = self.project_point(p, ysize, surf, slope)
-            result.append(proj)
+            for result, ysize in zip(results, ysizes):
+                # rotate_point( (0, ysize), angle )
+                r0 = (0 * cos - ysize * sin, ysize * cos + 0 * sin)
+                result.append( (r0[0] + p[0], r0[1] + p[1]) )
 
-        return result
+        return results
 
     def cutout_sweep(self, surf="top", xstart=0.0, xend=None, xdist=None,
                      ysize=0.0, pos=None, nudge=0.0):
         #print "ysize = " + str(ysize)
         #print "xstart = " + str(xstart) + " xend = " + str(xend) + " xdist = " + str(xdist)
-        if self.poly == None:
-            self.make_poly()
-        flush = self.project_contour(surf=surf, xstart=xstart,
-                                     xend=xend, xdist=xdist,
-                                     ysize=0.0)
-        surf1 = self.project_contour(surf=surf, xstart=xstart,
-                                     xend=xend, xdist=xdist,
-                                     ysize=-ysize)
-        surf2 = self.project_contour(surf=surf, xstart=xstart,
-                                     xend=xend, xdist=xdist,
-                                     ysize=ysize)
+        (flush, surf1, surf2) \
+            = self.project_contour_multi(surf=surf, xstart=xstart,
+                                         xend=xend, xdist=xdist,
+                                         ysizes=(0.0, -ysize, ysize))
         surf1.reverse()
         shape = surf1 + surf2
         mask = Polygon.Polygon(shape)
         #print str(mask)
-        self.poly = self.poly - mask
+        self.cut(mask)
 
         # generate 3d points as top surface and bottom surface
         top = []
@@ -718,12 +1507,36 @@ class Contour:
     # (hopefully) add rounded corners.  Right now left right walls are
     # vertical, but it should be possible to do angles (to leave an
     # interior triangle structure someday.)
+    # method selects how the rounded corners are made: "offset" grows
+    # the cut line outward by the corner radius in one convex hull (the
+    # Minkowski sum of its hull and a circle), "circles" is the
+    # original union of a circle at every point of the cut line.  Both
+    # give the same mask.
     def carve_shaped_hole(self, pos1=None, pos2=None, sweep=0.0,
                           material_width=0.0, radius=0.0,
-                          circle_points=32):
-        if self.poly == None:
-            self.make_poly()
+                          circle_points=32, method="offset"):
+        self.need_poly()
+
+        mask_cut = self.shaped_hole_cut_line(pos1, pos2, sweep,
+                                             material_width, radius)
+        if len(mask_cut) == 0:
+            return
+
+        if method == "circles":
+            mask = self.round_cut_line_circles(mask_cut, radius, circle_points)
+        else:
+            mask = self.round_cut_line_offset(mask_cut, radius, circle_points)
+        #for p in mask:
+        #    print "contour..."
+        #    print p
 
+        self.cut(mask)
+
+    # the center line of a 'radius' size cutting tool for a shaped
+    # hole: the rib interior shrunk by material_width + radius, clipped
+    # to the pos1 - pos2 column narrowed by radius
+    def shaped_hole_cut_line(self, pos1=None, pos2=None, sweep=0.0,
+                             material_width=0.0, radius=0.0):
         bounds = self.get_bounds()
 
         # hollow entire interior (longitudinal axis) at cut radius +
@@ -755,43 +1568,111 @@ class Contour:
         # Essentially if we sweep a circle centered on the enge of
         # this polygon, the outer bounds of that cut is the final
         # shape we want
-        mask_cut = mask1 & mask2
+        return geometry.intersection(mask1, mask2)
 
-        # pretend we are cutting by placing a 'radius' size circle at
-        # each point in the cut line and taking the union of all of
-        # those (incrementally)
+    # pretend we are cutting by placing a 'radius' size circle at
+    # each point in the cut line and taking the union of all of
+    # those (incrementally).  Quadratic in the length of the cut line.
+    def round_cut_line_circles(self, mask_cut, radius, circle_points):
         mask = None
         for p in mask_cut[0]:
-            circle = Polygon.Shapes.Circle(radius=radius, center=p, points=circle_points)
+            circle = make_circle(radius=radius, center=p, points=circle_points)
             if mask == None:
                 mask = circle
             else:
-                mask = Polygon.Utils.convexHull(mask | circle)
+                mask = geometry.convex_hull(geometry.union(mask, circle))
                 mask = self.reduce_degeneracy(mask)
 
-        mask = Polygon.Utils.convexHull(mask)
-        #for p in mask:
-        #    print "contour..."
-        #    print p
-
-        self.poly = self.poly - mask
+        return geometry.convex_hull(mask)
 
+    # the convex hull of those circles is the cut line's hull offset
+    # outward by radius (the Minkowski sum of the hull and the circle)
+    def round_cut_line_offset(self, mask_cut, radius, circle_points):
+        hull = geometry.convex_hull(Polygon.Polygon(mask_cut[0]))
+        circle = make_circle(radius=radius, points=circle_points)
+        pts = minkowski_sum_convex(hull[0], circle[0])
+        return geometry.convex_hull(Polygon.Polygon(pts))
 
+    # the ((minx, miny), (maxx, maxy)) of the top and bottom points.
+    # Cached until the points change.
     def get_bounds(self):
-        if len(self.top) < 1:
+        self.flush()
+        key = self.points_key()
+        cached = self._cache.get("bounds")
+        if cached != None and cached[0] == key:
+            return cached[1]
+        bounds = self.compute_bounds()
+        self._cache["bounds"] = (key, bounds)
+        return bounds
+
+    # changes whenever the top/bottom points do
+    def points_key(self):
+        return (self.version, len(self._top), len(self._bottom))
+
+    # the Polygon of the plain outline (no cuts), cached until the
+    # points change.  Shared, copy it before making changes.
+    def outline_poly(self):
+        self.flush()
+        key = self.points_key()
+        cached = self._cache.get("outline")
+        if cached == None or cached[0] != key:
+            poly = Polygon.Polygon(self.get_outline())
+            cached = (key, poly)
+            self._cache["outline"] = cached
+        return cached[1]
+
+    def compute_bounds(self):
+        if len(self._top) < 1:
             return ( (0,0), (0,0) )
+        if self.storage == "array":
+            pts = np.concatenate( (self.get_array("top"),
+                                   self.get_array("bottom")) )
+            pmin = pts.min(axis=0)
+            pmax = pts.max(axis=0)
+            return ( (float(pmin[0]), float(pmin[1])),
+                     (float(pmax[0]), float(pmax[1])) )
         pt = self.top[0]
         minx = pt[0]
         maxx = pt[0]
         miny = pt[1]
         maxy = pt[1]
-        for pt in self.top + self.bottom:
-            if pt[0] < minx:
-                minx = pt[0]
-            if pt[0] > maxx:
-                maxx = pt[0]
-            if pt[1] < miny:
-                miny = pt[1]
-            if pt[1] > maxy:
-                maxy = pt[1]
+        for curve in (self._top, self._bottom):
+            for pt in curve:
+                if pt[0] < minx:
+                    minx = pt[0]
+                if pt[0] > maxx:
+                    maxx = pt[0]
+                if pt[1] < miny:
+                    miny = pt[1]
+                if pt[1] > maxy:
+                    maxy = pt[1]
         return ( (minx, miny), (maxx, maxy) )
+
+    # value of func(poly), cached until the Polygon changes.  A
+    # contour without a Polygon yet (like a shared template) uses its
+    # plain outline.
+    def poly_metric(self, name, func):
+        poly = self.poly
+        if poly == None:
+            poly = self.outline_poly()
+            key = ("outline", self.points_key())
+        else:
+            key = self.poly_version
+        cached = self._poly_metrics.get(name)
+        if cached != None and cached[0] == key:
+            return cached[1]
+        value = func(poly)
+        self._poly_metrics[name] = (key, value)
+        return value
+
+    # the convex hull of the Polygon (shared, copy it before making
+    # changes)
+    def hull(self):
+        return self.poly_metric("hull", geometry.convex_hull)
+
+    def hull_area(self):
+        return self.poly_metric("hull_area", lambda poly: self.hull().area())
+
+    # area of the Polygon (minus any holes)
+    def area(self):
+        return self.poly_metric("area", lambda poly: poly.area())
@@ -0,0 +1,212 @@
+# geometry.py - 2d clipping backends for part outlines
+#
+# Copyright (C) 2013-2017 - Curtis Olson, curtolson@flightgear.org
+# http://madesigner.flightgear.org
+
+# Part outlines are always stored as Polygon.Polygon objects, but the
+# boolean operations and tests on them (rib cutting, nesting) go
+# through the functions below so the clipping engine doing the work
+# can be picked per build:
+#
+#   "polygon"  the Polygon library (default)
+#   "clipper"  pyclipper (integer coordinates), if it is installed
+#
+# Operations a backend doesn't provide (convex hull, filling holes,
+# triangle strips) fall back to the Polygon library.
+
+import Polygon
+import Polygon.Utils
+
+try:
+    import pyclipper
+except ImportError:
+    pyclipper = None
+
+
+class PolygonBackend:
+    name = "polygon"
+
+    def union(self, poly1, poly2):
+        return poly1 + poly2
+
+    def difference(self, poly1, poly2):
+        return poly1 - poly2
+
+    def intersection(self, poly1, poly2):
+        return poly1 & poly2
+
+    # poly minus the union of all the masks
+    def subtract(self, poly, masks):
+        union = masks[0]
+        for mask in masks[1:]:
+            union = union + mask
+        return poly - union
+
+    # true if poly1 completely covers poly2
+    def covers(self, poly1, poly2):
+        return poly1.covers(poly2)
+
+    def overlaps(self, poly1, poly2):
+        return poly1.overlaps(poly2)
+
+    def convex_hull(self, poly):
+        return Polygon.Utils.convexHull(poly)
+
+    def fill_holes(self, poly):
+        return Polygon.Utils.fillHoles(poly)
+
+    def tri_strip(self, poly):
+        return poly.triStrip()
+
+
+# Coordinates are snapped to a 2^-32 grid for the integer clipper
+# (far below any cutting tolerance, and leaves room for parts a few
+# hundred million units across).
+class ClipperBackend(PolygonBackend):
+    name = "clipper"
+    scale = float(2**32)
+
+    # the contours of poly as clipper paths, outlines counter
+    # clockwise and holes clockwise so a nonzero fill treats every
+    # Polygon (and a list of overlapping ones) the way Polygon does.
+    # If box is given, contours outside of it are left out (they can't
+    # change an intersection with anything inside box).
+    def paths(self, poly, box=None):
+        result = []
+        for i, contour in enumerate(poly):
+            if len(contour) < 3:
+                continue
+            if box != None and not overlap_box(poly.boundingBox(i), box):
+                continue
+            scale = self.scale
+            path = [ (round(p[0] * scale), round(p[1] * scale))
+                     for p in contour ]
+            if pyclipper.Orientation(path) == poly.isHole(i):
+                path.reverse()
+            result.append(path)
+        return result
+
+    def polygon(self, paths):
+        result = Polygon.Polygon()
+        # outlines first, then holes
+        for hole in (False, True):
+            for path in paths:
+                if pyclipper.Orientation(path) == hole:
+                    continue
+                contour = [ (p[0] / self.scale, p[1] / self.scale)
+                            for p in path ]
+                result.addContour(contour, hole)
+        return result
+
+    def clip(self, op, subjects, clips, box=None):
+        pc = pyclipper.Pyclipper()
+        for poly in subjects:
+            paths = self.paths(poly, box)
+            if len(paths):
+                pc.AddPaths(paths, pyclipper.PT_SUBJECT, True)
+        for poly in clips:
+            paths = self.paths(poly, box)
+            if len(paths):
+                pc.AddPaths(paths, pyclipper.PT_CLIP, True)
+        return pc.Execute(op, pyclipper.PFT_NONZERO, pyclipper.PFT_NONZERO)
+
+    def union(self, poly1, poly2):
+        return self.polygon(self.clip(pyclipper.CT_UNION, [poly1, poly2], []))
+
+    def difference(self, poly1, poly2):
+        return self.polygon(self.clip(pyclipper.CT_DIFFERENCE,
+                                      [poly1], [poly2]))
+
+    def intersection(self, poly1, poly2):
+        if len(poly1) == 0 or len(poly2) == 0:
+            return Polygon.Polygon()
+        return self.polygon(self.clip(pyclipper.CT_INTERSECTION,
+                                      [poly1], [poly2],
+                                      box=poly2.boundingBox()))
+
+    # all the masks go in as one clip set (a single clipper pass)
+    def subtract(self, poly, masks):
+        return self.polygon(self.clip(pyclipper.CT_DIFFERENCE,
+                                      [poly], masks))
+
+    def covers(self, poly1, poly2):
+        if len(poly2) == 0:
+            return True
+        if len(poly1) == 0:
+            return False
+        box = poly2.boundingBox()
+        if not contains_box(poly1.boundingBox(), box):
+            return False
+        return len(self.clip(pyclipper.CT_DIFFERENCE, [poly2], [poly1],
+                             box=box)) == 0
+
+    def overlaps(self, poly1, poly2):
+        if len(poly1) == 0 or len(poly2) == 0:
+            return False
+        box = poly2.boundingBox()
+        if not overlap_box(poly1.boundingBox(), box):
+            return False
+        return len(self.clip(pyclipper.CT_INTERSECTION,
+                             [poly1], [poly2], box=box)) > 0
+
+
+# true if Polygon.boundingBox() boxes b1 and b2 share some area
+def overlap_box(b1, b2):
+    return b1[0] < b2[1] and b2[0] < b1[1] \
+        and b1[2] < b2[3] and b2[2] < b1[3]
+
+# true if Polygon.boundingBox() box b1 contains box b2
+def contains_box(b1, b2):
+    return b1[0] <= b2[0] and b2[1] <= b1[1] \
+        and b1[2] <= b2[2] and b2[3] <= b1[3]
+
+backends = { "polygon": PolygonBackend, "clipper": ClipperBackend }
+
+# the names of the backends that can be used here
+def available_backends():
+    result = [ "polygon" ]
+    if pyclipper != None:
+        result.append("clipper")
+    return result
+
+_backend = PolygonBackend()
+
+# select the clipping engine by name (stays in effect until changed)
+def set_backend(name):
+    global _backend
+    if name not in available_backends():
+        print("ERROR: Unknown or unavailable geometry backend:", name)
+        print("Defaulting to 'polygon'")
+        name = "polygon"
+    if _backend.name != name:
+        _backend = backends[name]()
+
+def get_backend():
+    return _backend.name
+
+def union(poly1, poly2):
+    return _backend.union(poly1, poly2)
+
+def difference(poly1, poly2):
+    return _backend.difference(poly1, poly2)
+
+def intersection(poly1, poly2):
+    return _backend.intersection(poly1, poly2)
+
+def subtract(poly, masks):
+    return _backend.subtract(poly, masks)
+
+def covers(poly1, poly2):
+    return _backend.covers(poly1, poly2)
+
+def overlaps(poly1, poly2):
+    return _backend.overlaps(poly1, poly2)
+
+def convex_hull(poly):
+    return _backend.convex_hull(poly)
+
+def fill_holes(poly):
+    return _backend.fill_holes(poly)
+
+def tri_strip(poly):
+    return _backend.tri_strip(poly)
@@ -6,15 +6,14 @@ __version__ = "1.0"
 __license__ = "GPL v2"
 
 
-import copy
 import math
 import numpy as np
 import Polygon
 import Polygon.IO
-import Polygon.Utils
 import svgwrite
 
 from . import airfoil
+from . import geometry
 
 
 class Sheet:
@@ -44,7 +43,7 @@ class Sheet:
         print("Placing:", part.labels)
         if part.poly == None:
             part.make_poly()
-        p = copy.deepcopy(part.poly)
+        p = Polygon.Polygon(part.poly)
         p.flop(0.0)
         bounds = p.boundingBox()
         dx = bounds[1] - bounds[0]
@@ -64,10 +63,12 @@ class Sheet:
                                       [bounds[0], bounds[3]] ])
         elif speed == "medium":
             # make convex hull outline of polygon, and make grow it a tiny bit
-            hull = Polygon.Utils.convexHull(p)
+            # (the part caches its hull, flop a copy to match p)
+            hull = Polygon.Polygon(part.hull())
+            hull.flop(0.0)
         elif speed == "nice":
             # more details polygon yields better fit, but nesting takes longer
-            hull = Polygon.Utils.fillHoles(p)
+            hull = geometry.fill_holes(p)
         else:
             print("ERROR: Unknown nesting speed/quality:", speed)
             print("Defaulting to 'fast'")
@@ -93,7 +94,8 @@ class Sheet:
                 y += self.step
                 bmask = Polygon.Polygon(hull)
                 bmask.shift(x, y)
-                if sheet.covers(bmask) and not self.mask.overlaps(bmask):
+                if geometry.covers(sheet, bmask) \
+                   and not geometry.overlaps(self.mask, bmask):
                     found = True
                     dist = math.sqrt(x*x + y*y)
                     if dist < best_dist:
@@ -109,7 +111,7 @@ class Sheet:
         bmask.shift(best_x, best_y)
 
         # merge bounds mask into sheet mask
-        self.mask += bmask
+        self.mask = geometry.union(self.mask, bmask)
 
         #Polygon.IO.writeGnuplotTriangles("mask.plt", [self.mask])
         #result = raw_input("press enter to continue:")
@@ -123,7 +125,7 @@ class Sheet:
         p.scale( self.dpi, self.dpi, 0.0, 0.0 )
 
         if outline:
-            tmp = copy.deepcopy(part)
+            tmp = part.clone()
             tmp.scale( self.dpi, -self.dpi )
             shape = tmp.top
             shape.reverse()
@@ -177,14 +179,15 @@ class Sheet:
         # sanity check
         if orig_contour.poly == None:
             orig_contour.make_poly()
-        contour = copy.deepcopy(orig_contour)
+        # only the bounds and the label text are drawn, so there is
+        # no need for a scaled copy of the contour
+        contour = orig_contour
         #contour.scale(1,-1)
         bounds = contour.poly.boundingBox()
         dx = bounds[1] - bounds[0]
         #print "contour bounds = " + str(bounds)
         #print "dx = " + str(dx)
 
-        contour.scale( self.dpi, self.dpi )
         shape = []
         x1 = bounds[0] * self.dpi
         x2 = bounds[1] * self.dpi
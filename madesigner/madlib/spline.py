@@ -97,6 +97,8 @@
 # Curtis L. Olson <curtolson ata flightgear dota org >
 #
 
+import numpy as np
+
 def derivative1(points):
     n = len(points)-1 # index of last point
     y2 = list(range(n+1))
@@ -106,34 +108,59 @@ def derivative1(points):
         y2[i]=(points[i+1][1]-points[i-1][1]) / (points[i+1][0]-points[i-1][0])
     return y2
 
+# derivative1() of the points xa, ya (arrays), same arithmetic, returns
+# an array
+def derivative1_array(xa, ya):
+    n = len(xa)-1 # index of last point
+    y1 = np.empty(n+1)
+    y1[0] = (ya[1]-ya[0]) / (xa[1]-xa[0])
+    y1[n] = (ya[n]-ya[n-1]) / (xa[n]-xa[n-1])
+    y1[1:n] = (ya[2:]-ya[:-2]) / (xa[2:]-xa[:-2])
+    return y1
+
 
 def derivative2(points, yp1 = "", ypn = ""):
-    n = len(points)-1 # index of last point
-    y2 = list(range(n+1))
-    u = list(range(n+1))
     if yp1 == "":
-        y2[0] = 0
-        u[0] = 0
-    else:
+        yp1 = None
+    if ypn == "":
+        ypn = None
+    pts = np.asarray(points, dtype=float)
+    return solve_derivative2(pts[:,0], pts[:,1], yp1, ypn).tolist()
+
+# solve the tridiagonal system for the 2nd derivatives of the spline
+# through (xa, ya).  yp1/ypn are the 1st derivatives at the end points
+# (clamped end), or None for a 'natural' end.  The per point terms
+# are computed as arrays, only the forward/back substitution loops
+# remain in python.
+def solve_derivative2(xa, ya, yp1=None, ypn=None):
+    n = len(xa)-1 # index of last point
+    y2 = [0.0] * (n+1)
+    u = [0.0] * (n+1)
+    if yp1 != None:
         y2[0] = -0.5
-        u[0] = (3/(points[1][0]-points[0][0]))*((points[1][1]-points[0][1])/(points[1][0]-points[0][0])-float(yp1))
-    for i in range(1, n):
-        sig = (points[i][0]-points[i-1][0])/(points[i+1][0]-points[i-1][0])
-        p = sig * y2[i-1] + 2.0
-        y2[i] = (sig-1.0) / p
-        u[i] = (6.0*( (points[i+1][1]-points[i][1])/(points[i+1][0]-points[i][0])-(points[i][1]-points[i-1][1])/(points[i][0]-points[i-1][0]))/(points[i+1][0]-points[i-1][0])-sig*u[i-1])/p;
+        u[0] = (3/(xa[1]-xa[0]))*((ya[1]-ya[0])/(xa[1]-xa[0])-float(yp1))
+    if n > 1:
+        dx = xa[1:] - xa[:-1]
+        slope = (ya[1:] - ya[:-1]) / dx
+        span = xa[2:] - xa[:-2]
+        sig = (dx[:-1] / span).tolist()
+        rhs = (6.0 * (slope[1:] - slope[:-1]) / span).tolist()
+        for i in range(1, n):
+            p = sig[i-1] * y2[i-1] + 2.0
+            y2[i] = (sig[i-1]-1.0) / p
+            u[i] = (rhs[i-1]-sig[i-1]*u[i-1])/p
 
-    if ypn == "":
+    if ypn == None:
         qn = 0
         un = 0
     else:
         qn = 0.5
-        un = (3.0/(points[n][0]-points[n-1][0]))*(float(ypn)-(points[n][1]-points[n-1][1])/(points[n][0]-points[n-1][0]))
+        un = (3.0/(xa[n]-xa[n-1]))*(float(ypn)-(ya[n]-ya[n-1])/(xa[n]-xa[n-1]))
     y2[n] = (un-qn*u[n-1])/(qn*y2[n-1]+1.0)
     for i in range(n-1, -1, -1):
         y2[i] = y2[i]*y2[i+1]+u[i]
 
-    return y2
+    return np.array(y2)
 
 def spline(points, y2, i, v):
     klo = i
@@ -166,3 +193,96 @@ def linsearch(points, v, khi):
         khi += 1
     return khi - 1
 
+
+# numpy versions of binsearch() and spline() that look up and
+# evaluate an entire array of values at once.  xa, ya, and y2 are
+# arrays of the x ordinates, y ordinates, and 2nd derivatives.
+
+# returns the array of indices just below each value (same result as
+# calling binsearch() for each value)
+def binsearch_array(xa, v):
+    n = len(xa)
+    index = np.searchsorted(xa, v, side='right') - 1
+    return np.clip(index, 0, max(n-2, 0))
+
+# binsearch() for an array of values: the same bisection steps are
+# replayed for all the values at once, so the result matches
+# binsearch() exactly even when xa isn't sorted (i.e. a rotated
+# contour)
+def binsearch_many(xa, v):
+    v = np.asarray(v, dtype=float)
+    klo = np.zeros(v.shape, dtype=np.int64)
+    khi = np.full(v.shape, len(xa)-1, dtype=np.int64)
+    active = (khi - klo) > 1
+    while np.any(active):
+        k = (khi + klo) // 2
+        above = xa[k] > v
+        khi = np.where(active & above, k, khi)
+        klo = np.where(active & ~above, k, klo)
+        active = (khi - klo) > 1
+    return klo
+
+def spline_array(xa, ya, y2, index, v):
+    klo = index
+    khi = index + 1
+    h = xa[khi] - xa[klo]
+    zero = (h == 0)
+    if np.any(zero):
+        print("Zero interval in spline data.")
+        h = np.where(zero, 1.0, h)
+    a = (xa[khi] - v) / h
+    b = (v - xa[klo]) / h
+    result = a*ya[klo] + b*ya[khi]+((a*a*a-a)*y2[klo]+(b*b*b-b)*y2[khi])*(h*h)/6.0
+    return np.where(zero, 0.0, result)
+
+
+# Spline object (the Math::Spline class interface.)  The 2nd
+# derivatives are solved once at construction and stored as per
+# interval cubic coefficients so that any number of x values can be
+# evaluated in a single call:
+#
+#    sp = spline.Spline(points)            (natural end conditions)
+#    sp = spline.Spline(points, yp1, ypn)  (clamped end slopes)
+#    y = sp.evaluate(x)                    (x may be a scalar or array)
+#
+# sp.y2 holds the same 2nd derivatives as derivative2(points) so the
+# object can stand in wherever the function API is used.
+class Spline:
+    def __init__(self, points, yp1=None, ypn=None):
+        pts = np.asarray(points, dtype=float)
+        self.x = pts[:,0]
+        self.y = pts[:,1]
+        self.y2 = solve_derivative2(self.x, self.y, yp1, ypn)
+
+        # cubic coefficients for each interval, in terms of
+        # t = v - x[i]: y = a + b*t + c*t^2 + d*t^3
+        h = self.x[1:] - self.x[:-1]
+        self.zero = (h == 0)
+        if np.any(self.zero):
+            print("Zero interval in spline data.")
+            h = np.where(self.zero, 1.0, h)
+        y2 = self.y2
+        self.a = self.y[:-1]
+        self.b = (self.y[1:] - self.y[:-1]) / h \
+            - h * (2.0*y2[:-1] + y2[1:]) / 6.0
+        self.c = y2[:-1] * 0.5
+        self.d = (y2[1:] - y2[:-1]) / (6.0 * h)
+
+    # index of the interval containing each value (see binsearch())
+    def index(self, v):
+        return binsearch_array(self.x, v)
+
+    def evaluate(self, v, index=None):
+        scalar = np.ndim(v) == 0
+        v = np.asarray(v, dtype=float)
+        if index is None:
+            index = self.index(v)
+        t = v - self.x[index]
+        result = self.a[index] + t*(self.b[index] + t*(self.c[index] + t*self.d[index]))
+        result = np.where(self.zero[index], 0.0, result)
+        if scalar:
+            return float(result)
+        return result
+
+    def __call__(self, v):
+        return self.evaluate(v)
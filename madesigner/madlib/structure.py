@@ -3,15 +3,11 @@
 # Copyright (C) 2013-2017 - Curtis Olson, curtolson@flightgear.org
 # http://madesigner.flightgear.org
 
-import copy
 import math
 import numpy as np
 import re
 import sys, os
 
-import Polygon
-import Polygon.Utils
-
 from . import ac3d
 from . import airfoil
 from . import contour
@@ -139,18 +135,33 @@ class Rib:
         self.has_le = True      # has leading edge
         self.has_te = True      # has trailing edge
 
+    # return a copy of this rib (with its own contour) that can be
+    # changed without affecting the original
+    def clone(self):
+        result = Rib()
+        result.__dict__.update(self.__dict__)
+        result.pos = list(self.pos)
+        if self.contour != None:
+            result.contour = self.contour.clone()
+        return result
+
     # returns the bottom front location which is hard to compute
     # externally (this can be used by the calling layer to position a
     # boundary stringer.
     def find_flap_bottom_front(self, cutpos, angle):
+        (tx, ty, wedge_slope) = self.flap_hinge(cutpos, angle)
+        bx = self.contour.intersect("bottom", (tx, ty), wedge_slope)
+        return bx
+
+    # the flap hinge point on the top surface (ty is None if it is off
+    # the rib) and the slope of the wedge line down from it
+    def flap_hinge(self, cutpos, angle):
         wedge_angle = math.radians(90.0-angle)
         wedge_slope = -math.tan(wedge_angle)
         
         tx = self.contour.get_xpos(cutpos, station=self.pos[0])
         ty = self.contour.simple_interp(self.contour.top, tx)
-
-        bx = self.contour.intersect("bottom", (tx, ty), wedge_slope)
-        return bx
+        return (tx, ty, wedge_slope)
 
     def trim_rear(self, cutpos):
         self.contour.trim(surf="top", discard="rear", cutpos=cutpos, station=self.pos[0])
@@ -160,11 +171,19 @@ class Rib:
     # externally (this can be used by the calling layer to position a
     # boundary stringer.
     def trim_front_wedge(self, cutpos, angle):
-        self.contour.trim(surf="top", discard="front", cutpos=cutpos, station=self.pos[0])
+        self.trim_front_top(cutpos)
         bx = self.find_flap_bottom_front(cutpos, angle)
+        self.trim_front_bottom(bx)
+        return bx
+
+    # the two halves of trim_front_wedge(), bx is the bottom front of
+    # the flap found after the top trim
+    def trim_front_top(self, cutpos):
+        self.contour.trim(surf="top", discard="front", cutpos=cutpos, station=self.pos[0])
+
+    def trim_front_bottom(self, bx):
         botpos = contour.Cutpos( xpos=bx )
         self.contour.trim(surf="bottom", discard="front", cutpos=botpos, station=self.pos[0])
-        return bx
 
     # segment line: divide line in half and leave a small bit uncut in
     # middle and ends
@@ -187,17 +206,30 @@ class Rib:
         
     # instead of trimming, add cut lines so the part is intact, but
     # can be separated easily after the structure is assembled.
-    def add_wedge_cut_lines(self, cutpos, angle):
+    # (brx is the bottom rear of the wedge if it is already known, see
+    # find_flap_bottom_fronts())
+    def add_wedge_cut_lines(self, cutpos, angle, brx=None):
         # hinge point (top)
         tx = self.contour.get_xpos(cutpos, station=self.pos[0])
         ty = self.contour.simple_interp(self.contour.top, tx)
+        if ty == None:
+            print("warning: flap hinge of " + self.get_label()
+                  + " is off the rib, no wedge cut lines")
+            return
 
-        # bottom front of wedge (directly below hinge line)
-        bfy = self.contour.simple_interp(self.contour.bottom, tx)
-        
+        # bottom front of wedge (directly below hinge line) and
         # bottom rear of wedge (front of flap on the bottom)
-        brx = self.find_flap_bottom_front(cutpos, angle)
-        bry = self.contour.simple_interp(self.contour.bottom, brx)
+        if brx == None:
+            brx = self.find_flap_bottom_front(cutpos, angle)
+        if brx == None:
+            print("warning: flap wedge of " + self.get_label()
+                  + " misses the bottom surface, no wedge cut lines")
+            return
+        bfy, bry = self.contour.interp_many("bottom", [tx, brx]).tolist()
+        if math.isnan(bfy) or math.isnan(bry):
+            print("warning: flap wedge of " + self.get_label()
+                  + " is off the bottom surface, no wedge cut lines")
+            return
 
         front = self.segment_line([tx, ty], [tx, bfy]) # front of wedge
         rear = self.segment_line([tx, ty], [brx, bry]) # rear of wedge
@@ -231,10 +263,27 @@ class Rib:
         self.contour.add_label( xcenter, ycenter, 14, 0, label )
 
     def hull_area(self):
-        if self.contour.poly == None:
-            self.contour.make_poly()
-        hull = Polygon.Utils.convexHull(self.contour.poly)
-        return hull.area()
+        return self.contour.hull_area()
+
+
+# Rib.find_flap_bottom_front() for a list of (rib, cutpos, angle),
+# with the wedge lines of all the ribs intersected in one pass (see
+# contour.first_line_intersections()).  The bottom front is None for
+# a rib whose hinge is off its top surface.
+def find_flap_bottom_fronts(queries):
+    curves = []
+    pts = []
+    slopes = []
+    for (rib, cutpos, angle) in queries:
+        (tx, ty, wedge_slope) = rib.flap_hinge(cutpos, angle)
+        if ty == None:
+            curves.append(np.zeros((0, 2)))
+            pts.append((tx, 0.0))
+        else:
+            curves.append(rib.contour.surface_array("bottom"))
+            pts.append((tx, ty))
+        slopes.append(wedge_slope)
+    return contour.first_line_intersections(curves, pts, slopes)
 
 
 class Structure:
@@ -274,11 +323,13 @@ class Structure:
         # build parameters
         self.airfoil_samples = 50 # 50 = fast, 100 = mid, 1000 = quality
         self.circle_points = 8    # 8 = fast, 16 = mid, 32 = quality
+        self.contour_storage = "list" # "list" or "array" (see contour.py)
 
+    # note: root and tip are shared (read only) airfoil templates
     def load_airfoils(self, root, tip=None):
-        self.root = airfoil.Airfoil(root, self.airfoil_samples, True)
+        self.root = airfoil.shared(root, self.airfoil_samples, True)
         if tip:
-            self.tip = airfoil.Airfoil(tip, self.airfoil_samples, True)
+            self.tip = airfoil.shared(tip, self.airfoil_samples, True)
 
     # define the rib 'stations' as evenly spaced
     def set_num_stations(self, count):
@@ -517,13 +568,25 @@ class Structure:
                 result = False
         return result
             
+    # airfoil may be an Airfoil or a (blended) airfoil.StationView.
+    # Returns None (no rib) if the chord isn't positive.
     def make_raw_rib(self, airfoil, chord, lat_dist, sweep_dist, twist, label ):
+        if chord <= 0.0:
+            print("warning: skipping rib " + label + " @ " + str(lat_dist) \
+                + " with chord = " + str(chord))
+            return None
         result = Rib()
-        result.contour = copy.deepcopy(airfoil)
-
-        # scale and position
+        result.contour = airfoil.clone(parametric=False)
+        result.contour.storage = self.contour_storage
+
+        # simplify the outline in chord units (to a tolerance of
+        # 0.002 at this chord) and scale it to size.  The fit is
+        # cached on the airfoil, so ribs of the same chord (and the
+        # left/right pair of each station) share it.
+        (top, bottom) = airfoil.fitted(500, 0.002 / chord)
+        result.contour.top = list(top)
+        result.contour.bottom = list(bottom)
         result.contour.scale(chord, chord)
-        result.contour.fit(500, 0.002)
         result.contour.move(-self.center*chord, 0.0)
         result.contour.save_bounds()
 
@@ -587,37 +650,42 @@ class Structure:
                     rot_shape = rotate(shape, rib.pos[1], rib.twist)
                     stringer.points.append(rot_shape)
 
-        # hole cutouts
+        # hole cutouts.  Holes only cut the Polygon (not the top and
+        # bottom curves) so look up the surface heights at pos1 of all
+        # the holes at once (only the simple holes use them)
+        holes = []
         for hole in self.holes:
             if self.match_station(hole.start_station, hole.end_station, lat_dist):
-                if hole.type == "simple":
-                    print('hole:', lat_dist)
-                    xpos = rib.contour.get_xpos(hole.pos1,
-                                                station=rib.pos[0],
-                                                sweep=rib.pos[1])
-                    ty = rib.contour.simple_interp(rib.contour.top, xpos)
-                    by = rib.contour.simple_interp(rib.contour.bottom, xpos)
-                    print('xpos:', xpos, ty, by)
-                    if ty == None or by == None:
-                        continue
-                    ypos = (ty + by) * 0.5
-                    if hole.style == 'Radius':
-                        radius = hole.size
-                    elif hole.style == '% Height':
-                        radius = (ty - by) * hole.size * 0.5
-                    if radius < 0.0:
-                        radius = 0.0
-                    print('ok')
-                    rib.contour.cut_hole( xpos, ypos, radius,
-                                          points=self.circle_points )
-                elif hole.type == "shaped":
-                    #print "make shaped hole"
-                    rib.contour.carve_shaped_hole( pos1=hole.pos1,
-                                                   pos2=hole.pos2,
-                                                   sweep=rib.pos[1],
-                                                   material_width=hole.material_width,
-                                                   radius=hole.radius,
-                                                   circle_points=self.circle_points )
+                holes.append(hole)
+        xlist = [ rib.contour.get_xpos(hole.pos1, station=rib.pos[0],
+                                       sweep=rib.pos[1])
+                  for hole in holes ]
+        tylist = rib.contour.interp_many("top", xlist).tolist()
+        bylist = rib.contour.interp_many("bottom", xlist).tolist()
+        for (hole, xpos, ty, by) in zip(holes, xlist, tylist, bylist):
+            if hole.type == "simple":
+                print('hole:', lat_dist)
+                print('xpos:', xpos, ty, by)
+                if math.isnan(ty) or math.isnan(by):
+                    continue
+                ypos = (ty + by) * 0.5
+                if hole.style == 'Radius':
+                    radius = hole.size
+                elif hole.style == '% Height':
+                    radius = (ty - by) * hole.size * 0.5
+                if radius < 0.0:
+                    radius = 0.0
+                print('ok')
+                rib.contour.cut_hole( xpos, ypos, radius,
+                                      points=self.circle_points )
+            elif hole.type == "shaped":
+                #print "make shaped hole"
+                rib.contour.carve_shaped_hole( pos1=hole.pos1,
+                                               pos2=hole.pos2,
+                                               sweep=rib.pos[1],
+                                               material_width=hole.material_width,
+                                               radius=hole.radius,
+                                               circle_points=self.circle_points )
 
 
         # do rotate
@@ -656,11 +724,11 @@ class Structure:
     def layout_parts_templates(self, width, height, step=None, speed="fast"):
         l = layout.Layout( self.basename + '-template', width, height, step )
         for rib in self.right_ribs:
-            contour = copy.deepcopy(rib.contour)
+            contour = rib.contour.clone()
             contour.rotate(90)
             rib.placed = l.draw_part_demo(contour, speed=speed)
         for rib in self.left_ribs:
-            contour = copy.deepcopy(rib.contour)
+            contour = rib.contour.clone()
             contour.rotate(90)
             rib.placed = l.draw_part_demo(contour, speed=speed)
         l.save()
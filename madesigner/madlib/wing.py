@@ -8,6 +8,7 @@ import math
 
 from . import airfoil
 from . import contour
+from . import structure
 from .structure import Structure, Stringer
 from . import spline
 
@@ -142,7 +143,7 @@ class Wing(Structure):
         for rib in base_ribs:
             type = self.get_station_rib_type(rib.pos[0])
             if type == "inner":
-                newrib = copy.deepcopy(rib)
+                newrib = rib.clone()
                 newrib.nudge = rib.thickness * nudge_out
                 newrib.part = "flap"
                 newrib.type = type
@@ -150,7 +151,7 @@ class Wing(Structure):
                 new_ribs.append(rib)
                 new_ribs.append(newrib)
             elif type == "outer":
-                newrib = copy.deepcopy(rib)
+                newrib = rib.clone()
                 newrib.nudge = rib.thickness * nudge_in
                 newrib.part = "flap"
                 newrib.type = type
@@ -158,7 +159,7 @@ class Wing(Structure):
                 new_ribs.append(newrib)
                 new_ribs.append(rib)
             elif type == "shared":
-                newrib = copy.deepcopy(rib)
+                newrib = rib.clone()
                 newrib.nudge = rib.thickness * nudge_out
                 rib.part = "flap" 
                 newrib.part = "flap"
@@ -173,14 +174,43 @@ class Wing(Structure):
             else:
                 new_ribs.append(rib)
         return new_ribs
-    
+
+    # trim the front of each (rib, flap) pair's flap rib at the flap
+    # wedge (and note the bottom front for the flap's leading edge
+    # stringer), or add wedge cut lines to a middle rib.  No rib may
+    # be in the batch twice.
+    def cut_flap_ribs(self, batch):
+        trimmed = ("inner", "outer", "inner-shared")
+        for (rib, flap) in batch:
+            if rib.type in trimmed:
+                rib.trim_front_top(flap.pos)
+        fronts = structure.find_flap_bottom_fronts(
+            [ (rib, flap.pos, flap.angle) for (rib, flap) in batch ] )
+        for ((rib, flap), pos) in zip(batch, fronts):
+            if rib.type in trimmed:
+                rib.trim_front_bottom(pos)
+            if rib.type == "inner" or rib.type == "inner-shared":
+                flap.start_bot_str_pos = pos
+                print("flap start bot = " + str(pos))
+            elif rib.type == "outer" or rib.type == "outer-shared":
+                flap.end_bot_str_pos = pos
+                print("flap end bot = " + str(pos))
+            else:
+                # add cut lines
+                rib.add_wedge_cut_lines(flap.pos, flap.angle, brx=pos)
+
     def build(self):
         if len(self.stations) < 2:
             print("Must define at least 2 stations to build a wing")
             return
 
-        sweep_y2 = spline.derivative2( self.sweep.top )
-        taper_y2 = spline.derivative2( self.taper.top )
+        sweep_spline = spline.Spline( self.sweep.top )
+        taper_spline = spline.Spline( self.taper.top )
+
+        # blend the airfoils for all the stations in one pass
+        if self.tip:
+            percents = [station / self.span for station in self.stations]
+            blends = airfoil.blend_stations(self.root, self.tip, percents)
 
         # make the base ribs at each defined station
         for index, station in enumerate(self.stations):
@@ -190,7 +220,7 @@ class Wing(Structure):
             if not self.tip:
                 af = self.root
             else:
-                af = airfoil.blend(self.root, self.tip, percent)
+                af = blends[index]
 
             # compute placement parameters
             lat_dist = station
@@ -198,8 +228,7 @@ class Wing(Structure):
 
             # compute chord
             if self.taper:
-                sp_index = spline.binsearch(self.taper.top, lat_dist)
-                chord = spline.spline(self.taper.top, taper_y2, sp_index, lat_dist)
+                chord = taper_spline.evaluate(lat_dist)
             else:
                 print("Cannot build a wing with no chord defined!")
                 return
@@ -209,9 +238,7 @@ class Wing(Structure):
 
             # compute sweep offset pos if a sweep function provided
             if self.sweep:
-                sw_index = spline.binsearch(self.sweep.top, lat_dist)
-                sweep_dist = spline.spline(self.sweep.top, sweep_y2, sw_index,
-                                           lat_dist)
+                sweep_dist = sweep_spline.evaluate(lat_dist)
             else:
                 sweep_dist = 0.0
 
@@ -219,6 +246,8 @@ class Wing(Structure):
             label = 'WR' + str(index+1) 
             right_rib = self.make_raw_rib(af, chord, lat_dist, sweep_dist,
                                           twist, label)
+            if right_rib == None:
+                continue
             right_rib.side = "right"
             if percent < 0.001:
                 right_rib.nudge = -right_rib.thickness * 0.5
@@ -242,63 +271,28 @@ class Wing(Structure):
         self.right_ribs = self.make_new_ribs_for_flaps(self.right_ribs, 'right')
         self.left_ribs = self.make_new_ribs_for_flaps(self.left_ribs, 'left')
 
-        for rib in self.right_ribs:
-            rib_pos = rib.pos[0] - rib.nudge
-            for flap in self.flaps:
-                if self.match_station(flap.start_station, flap.end_station, rib_pos):
-                    if rib.part == "flap":
-                        if rib.type == "inner":
-                            pos = rib.trim_front_wedge(flap.pos, flap.angle)
-                            flap.start_bot_str_pos = pos
-                            print("flap start bot = " + str(pos))
-                        elif rib.type == "outer":
-                            pos = rib.trim_front_wedge(flap.pos, flap.angle)
-                            flap.end_bot_str_pos = pos
-                            print("flap end bot = " + str(pos))
-                        elif rib.type == "inner-shared":
-                            #pos = rib.find_flap_bottom_front(flap.pos, flap.angle)
-                            pos = rib.trim_front_wedge(flap.pos, flap.angle)
-                            flap.start_bot_str_pos = pos
-                            print("flap start bot = " + str(pos))
-                        elif rib.type == "outer-shared":
-                            pos = rib.find_flap_bottom_front(flap.pos, flap.angle)
-                            flap.end_bot_str_pos = pos
-                            print("flap end bot = " + str(pos))
-                        else:
-                            # add cut lines
-                            rib.add_wedge_cut_lines(flap.pos, flap.angle)
-                    else:
-                        print("skipping rear trim")
-                        # rib.trim_rear(flap.pos)
-
-        for rib in self.left_ribs:
+        # trim the flap ribs and add their wedge cut lines.  The wedge
+        # lines of a whole batch of ribs are intersected with the rib
+        # bottoms in one pass.  A rib under more than one flap starts
+        # a new batch since each trim changes what the next one works
+        # on.
+        jobs = []
+        for rib in self.right_ribs + self.left_ribs:
             rib_pos = rib.pos[0] - rib.nudge
             for flap in self.flaps:
                 if self.match_station(flap.start_station, flap.end_station, rib_pos):
                     if rib.part == "flap":
-                        if rib.type == "inner":
-                            pos = rib.trim_front_wedge(flap.pos, flap.angle)
-                            flap.start_bot_str_pos = pos
-                            print("flap start bot = " + str(pos))
-                        elif rib.type == "outer":
-                            pos = rib.trim_front_wedge(flap.pos, flap.angle)
-                            flap.end_bot_str_pos = pos
-                            print("flap end bot = " + str(pos))
-                        elif rib.type == "inner-shared":
-                            pos = rib.find_flap_bottom_front(flap.pos, flap.angle)
-                            pos = rib.trim_front_wedge(flap.pos, flap.angle)
-                            flap.start_bot_str_pos = pos
-                            print("flap start bot = " + str(pos))
-                        elif rib.type == "outer-shared":
-                            pos = rib.find_flap_bottom_front(flap.pos, flap.angle)
-                            flap.end_bot_str_pos = pos
-                            print("flap end bot = " + str(pos))
-                        else:
-                            # add cut lines
-                            rib.add_wedge_cut_lines(flap.pos, flap.angle)
+                        jobs.append( (rib, flap) )
                     else:
                         print("skipping rear trim")
                         # rib.trim_rear(flap.pos)
+        batch = []
+        for (rib, flap) in jobs:
+            if any(job[0] is rib for job in batch):
+                self.cut_flap_ribs(batch)
+                batch = []
+            batch.append( (rib, flap) )
+        self.cut_flap_ribs(batch)
 
         # now place the leading edge bottom stringer for each flap.
         # This is left until now because this can be very dynamic
@@ -20,6 +20,7 @@ setup( name = 'madesigner',
        #package_data = { 'madlib': ['airfoils/*.dat'] },
        data_files = [ ('examples', glob('madesigner/madgui/examples/*.mad')),
                       ('airfoils', glob('madesigner/madlib/airfoils/*.dat')) ],
-       install_requires = ['svgwrite', 'Polygon2']
+       install_requires = ['svgwrite', 'Polygon2'],
+       extras_require = { 'clipper': ['pyclipper'] }
 )
 